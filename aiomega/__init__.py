@@ -1,4 +1,8 @@
 from aiomega.client import Mega
+from aiomega.fingerprint import FingerprintCache
+from aiomega.manager import TransferManager
+from aiomega.sequence import NodeSequence
+from aiomega.snapshot import NodeInfo, StatResult, TransferInfo
 
 __version__ = "0.1.2"
 __author__ = "Jorge Alejandro Jimenez Luna"
@@ -0,0 +1,253 @@
+import asyncio
+import collections
+import threading
+
+from typing import Callable, Deque, Optional, Tuple
+
+from .dispatcher import Dispatcher
+from .error import MegaBufferOverflowError
+
+# The SDK keeps delivering the data it already has in flight after a pause, which
+# can be a few megabytes whatever the size of the buffer
+_MIN_OVERFLOW = 16777216
+
+
+class RingBuffer(object):
+    """
+    Bounded byte buffer filled by an SDK thread and drained by the event loop.
+
+    The storage is allocated once. There is a single producer and a single consumer:
+    each side copies into (or out of) its own region of the ring without holding the
+    lock, which only guards the positions. The loop is woken up once each time the
+    buffer goes from empty to non-empty, not once per written chunk.
+
+    The producer never blocks. When the buffered data reaches the high watermark
+    `pause` is called, and `resume` once the consumer drains it below the low
+    watermark. The data that still arrives while the ring is full is kept apart, up
+    to `max_overflow` bytes (by default the capacity, and at least 16 MiB). Past
+    that the stream fails with `MegaBufferOverflowError`, so the memory stays
+    bounded even if the SDK doesn't pause the transfer.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        dispatcher: Dispatcher,
+        pause: Optional[Callable[[], None]] = None,
+        resume: Optional[Callable[[], None]] = None,
+        high_watermark: Optional[int] = None,
+        low_watermark: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+    ) -> None:
+        self.capacity = capacity
+        self.dispatcher = dispatcher
+        self.pause = pause
+        self.resume = resume
+        self.high_watermark = (
+            high_watermark if high_watermark is not None else capacity * 3 // 4
+        )
+        self.low_watermark = (
+            low_watermark if low_watermark is not None else capacity // 4
+        )
+        self.max_overflow = (
+            max_overflow if max_overflow is not None else max(capacity, _MIN_OVERFLOW)
+        )
+
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._size = 0
+        self._overflow: Deque[bytes] = collections.deque()
+        self._overflow_size = 0
+        self._paused = False
+        self._eof = False
+        self._aborted = False
+        self._error: Optional[BaseException] = None
+
+        self._lock = threading.Lock()
+        self._waiter: Optional[asyncio.Future] = None
+
+    @property
+    def buffered(self) -> int:
+        """
+        Amount of bytes waiting for the consumer.
+        """
+        return self._size + self._overflow_size
+
+    def write(self, data: memoryview, size: int) -> bool:
+        """
+        Copy `data` into the buffer. Called from the SDK thread.
+
+        Returns:
+            :obj:`bool`: `False` if the consumer is gone or the buffer overflowed, and the
+            transfer should be cancelled.
+        """
+        pos = 0
+        while pos < size:
+            with self._lock:
+                if self._aborted:
+                    return False
+
+                # Once something overflowed, the rest goes after it
+                free = self.capacity - self._size
+                if self._overflow or free == 0:
+                    if self._overflow_size + size - pos > self.max_overflow:
+                        # The SDK kept sending after the pause, give up before
+                        # the memory grows any further
+                        break
+                    self._overflow.append(bytes(data[pos:size]))
+                    self._overflow_size += size - pos
+                    pos = size
+                    n = 0
+                else:
+                    end = (self._start + self._size) % self.capacity
+                    n = min(free, self.capacity - end, size - pos)
+
+            # The free region isn't visible to the consumer until `_size` grows
+            if n > 0:
+                self._view[end : end + n] = data[pos : pos + n]
+                pos += n
+
+            with self._lock:
+                self._size += n
+                waiter, self._waiter = self._waiter, None
+                pause = not self._paused and self.buffered >= self.high_watermark
+                if pause:
+                    self._paused = True
+            if waiter is not None:
+                self.dispatcher.call_soon(self._wakeup, waiter)
+            if pause and self.pause is not None:
+                self.pause()
+
+        if pos < size:
+            self.fail(MegaBufferOverflowError(self.max_overflow))
+            return False
+        return True
+
+    def close(self) -> None:
+        """
+        Signal the end of the data. Called from the SDK thread.
+        """
+        with self._lock:
+            self._eof = True
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            self.dispatcher.call_soon(self._wakeup, waiter)
+
+    def fail(self, exc: BaseException) -> None:
+        """
+        Stop accepting data and raise `exc` to the consumer. Thread-safe.
+
+        It's ignored once all the data arrived, the consumer can still read it.
+        """
+        with self._lock:
+            if self._eof:
+                return
+            if self._error is None:
+                self._error = exc
+            self._aborted = True
+            self._overflow.clear()
+            self._overflow_size = 0
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            self.dispatcher.call_soon(self._wakeup, waiter)
+
+    def abort(self) -> None:
+        """
+        Stop accepting data, because the consumer is gone.
+        """
+        with self._lock:
+            self._aborted = True
+            self._overflow.clear()
+            self._overflow_size = 0
+
+    async def readinto(self, buffer: memoryview) -> int:
+        """
+        Copy the available data, up to the size of `buffer`, waiting if there is none.
+
+        Returns:
+            :obj:`int`: The amount of bytes copied, `0` at the end of the data.
+        """
+        start, size = await self._wait()
+        if size == 0:
+            return self._take_overflow(buffer)
+
+        n = min(size, len(buffer))
+        first = min(n, self.capacity - start)
+
+        # The filled region isn't touched by the producer until `_size` shrinks
+        buffer[:first] = self._view[start : start + first]
+        if first < n:
+            buffer[first:n] = self._view[: n - first]
+
+        self._consume(n)
+        return n
+
+    async def read(self, n: int) -> bytes:
+        """
+        Return up to `n` bytes of the available data, waiting if there is none.
+        """
+        start, size = await self._wait()
+        if size == 0:
+            chunk = bytearray(min(n, self._overflow_size))
+            self._take_overflow(memoryview(chunk))
+            return bytes(chunk)
+
+        n = min(size, n)
+        first = min(n, self.capacity - start)
+
+        if first == n:
+            chunk = bytes(self._view[start : start + n])
+        else:
+            chunk = b"".join((self._view[start:], self._view[: n - first]))
+
+        self._consume(n)
+        return chunk
+
+    async def _wait(self) -> Tuple[int, int]:
+        # Return the start and size of the filled region of the ring, waiting
+        # while there is no data at all
+        while True:
+            with self._lock:
+                if self._error is not None:
+                    raise self._error
+                if self._size > 0 or self._overflow or self._eof:
+                    return self._start, self._size
+                waiter = self._waiter = self.dispatcher.loop.create_future()
+            await waiter
+
+    def _consume(self, n: int) -> None:
+        with self._lock:
+            self._start = (self._start + n) % self.capacity
+            self._size -= n
+        self._check_resume()
+
+    def _take_overflow(self, buffer: memoryview) -> int:
+        # The ring is empty, so the overflowed data is the oldest one
+        n = 0
+        with self._lock:
+            while self._overflow and n < len(buffer):
+                piece = self._overflow[0]
+                k = min(len(piece), len(buffer) - n)
+                buffer[n : n + k] = piece[:k]
+                if k == len(piece):
+                    self._overflow.popleft()
+                else:
+                    self._overflow[0] = piece[k:]
+                self._overflow_size -= k
+                n += k
+        self._check_resume()
+        return n
+
+    def _check_resume(self) -> None:
+        with self._lock:
+            resume = self._paused and self.buffered <= self.low_watermark
+            if resume:
+                self._paused = False
+        if resume and self.resume is not None:
+            self.resume()
+
+    @staticmethod
+    def _wakeup(waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            waiter.set_result(None)
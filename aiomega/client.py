@@ -1,161 +1,86 @@
+from __future__ import annotations
+
 import asyncio
-import functools
-import inspect
-import logging
+import collections
+import importlib.util
+import itertools
 import os
+import sys
+import types
 from types import TracebackType
 
 from typing import (
+    TYPE_CHECKING,
     Any,
+    Awaitable,
     Callable,
+    Deque,
     Dict,
     Generator,
     Generic,
+    Iterable,
     List,
     Optional,
     Type,
     Union,
     Tuple,
 )
-from .megasdk import (
-    MegaApi,
-    MegaRequestListener,
-    MegaTransferListener,
-    MegaProxy,
-    MegaRequest,
-    MegaTransfer,
-    MegaError,
-    MegaAccountDetails,
-    MegaNode,
-    MegaUser,
-    MegaShare,
-)
-
-from .error import MegaNodeNotFound, MegaRequestError
-
-
-class AsyncEvent(asyncio.Event):
-    def set(self) -> None:
-        self._loop.call_soon_threadsafe(super().set)
-
-
-class _RequestListener(MegaRequestListener):
-    def __init__(self) -> None:
-        self.finish_event: AsyncEvent = AsyncEvent()
-        self.request: MegaRequest = None
-        self.error: MegaError = None
-
-        super().__init__()
-
-    def onRequestStart(self, api: MegaApi, request: MegaRequest) -> None:
-        logging.info("Request start ({})".format(request))
-
-    def onRequestFinish(
-        self, api: MegaApi, request: MegaRequest, error: MegaError
-    ) -> None:
-        logging.info("Request finished ({}); Result: {}".format(request, error))
-
-        self.request = request.copy()
-        self.error = error.copy()
-        self.finish_event.set()
-
-    def onRequestTemporaryError(
-        self, api: MegaApi, request: MegaRequest, error: MegaError
-    ) -> None:
-        logging.info("Request temporary error ({}); Error: {}".format(request, error))
-
-
-class _TransferListener(MegaTransferListener):
-    def __init__(
-        self,
-        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
-        progress_args: Optional[Tuple] = (),
-    ) -> None:
-        self.finish_event: AsyncEvent = AsyncEvent()
-        self.transfer: MegaTransfer = None
-        self.error: MegaError = None
-        self.loop = asyncio.get_event_loop()
-        self.progress = progress
-        self.progress_args = progress_args
-
-        super().__init__()
-
-    def onTransferStart(self, api: MegaApi, transfer: MegaTransfer) -> None:
-        logging.info("Transfer start ({})".format(transfer))
-
-    def onTransferFinish(
-        self, api: MegaApi, transfer: MegaTransfer, error: MegaError
-    ) -> None:
-        logging.info(
-            "Transfer finished ({}); Result: {}".format(
-                transfer, transfer.getFileName(), error
-            )
-        )
-
-        self.transfer = transfer.copy()
-        self.error = error.copy()
-        self.finish_event.set()
-
-    def onTransferUpdate(self, api: MegaApi, transfer: MegaTransfer):
-        logging.info(
-            "Transfer update ({} {});"
-            " Progress: {} KB of {} KB, {} KB/s".format(
-                transfer,
-                transfer.getFileName(),
-                transfer.getTransferredBytes() / 1024,
-                transfer.getTotalBytes() / 1024,
-                transfer.getSpeed() / 1024,
-            )
-        )
 
-        func = functools.partial(
-            self.progress,
-            transfer.getTransferredBytes(),
-            transfer.getTotalBytes(),
-            transfer.getSpeed(),
-            *self.progress_args,
-        )
+from .buffer import RingBuffer
+from .dispatcher import Dispatcher
+from .error import MegaNodeNotFound, MegaRequestError, MegaTimeoutError
+from .export import scan_tree, to_arrow, to_numpy
+from .file import RemoteFile
+from .fingerprint import SHA256, FingerprintCache, content_hash
+from .index import CacheInfo, HashIndex, PathIndex
+from .sequence import NodeSequence
+from .snapshot import NodeInfo, StatResult, TransferInfo
+from .sync import SyncPlan, plan_sync, run_sync
+
+if TYPE_CHECKING:
+    from .megasdk import (
+        MegaApi,
+        MegaRequest,
+        MegaTransfer,
+        MegaAccountDetails,
+        MegaNode,
+        MegaNodeList,
+        MegaUser,
+        MegaShare,
+    )
+    from .listener import Pending
+
+
+def _lazy_import(name: str) -> types.ModuleType:
+    """
+    Return the module `name`, deferring its execution until the first attribute access.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
 
-        # Schedule
-        if inspect.iscoroutinefunction(self.progress):
-            asyncio.run_coroutine_threadsafe(func(), loop=self.loop)
-        else:
-            self.loop.call_soon_threadsafe(func)
-
-    def onTransferTemporaryError(
-        self, api: MegaApi, transfer: MegaTransfer, error: MegaError
-    ):
-        logging.info(
-            "Transfer temporary error ({} {}); Error: {}".format(
-                transfer, transfer.getFileName(), error
-            )
-        )
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
 
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
 
-class _TransferStreamingListener(_TransferListener):
-    def __init__(
-        self,
-        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
-        progress_args: Optional[Tuple] = (),
-    ) -> None:
-        super().__init__(progress, progress_args)
+    # Like the import statement, bind the submodule in its package
+    parent, _, child = name.rpartition(".")
+    setattr(sys.modules[parent], child, module)
+    return module
 
-        self.pipein, self.pipeout = os.pipe()
 
-    def onTransferData(
-        self, api: MegaApi, transfer: MegaTransfer, buffer: bytes, size: int
-    ) -> bool:
-        n = 0
-        while n < size:
-            n += os.write(self.pipeout, buffer)
-        assert n == size, "Unable to establish connection with read pipe extreme"
-        return True
+# The SWIG module loads the native extension, and `MegaApi` starts the SDK
+# threads, so both are deferred until the client really talks to MEGA
+megasdk = _lazy_import("aiomega.megasdk")
+listener = _lazy_import("aiomega.listener")
 
-    def onTransferFinish(
-        self, api: MegaApi, transfer: MegaTransfer, error: MegaError
-    ) -> None:
-        os.close(self.pipeout)
-        super().onTransferFinish(api, transfer, error)
+# Custom node attribute with the SHA-256 of the content, see `upload(...)`
+HASH_ATTRIBUTE = "sha256"
 
 
 class Mega(object):
@@ -168,9 +93,11 @@ class Mega(object):
         app_key: str,
         base_path: Optional[str] = None,
         user_agent: Optional[str] = None,
-        timeout: Optional[int] = None,
+        timeout: Optional[float] = None,
         proxy: Optional[Dict[str, Union[str, None]]] = None,
         http_only: bool = False,
+        path_cache_size: int = 4096,
+        snapshots: bool = False,
         **kwargs,
     ) -> None:
         """
@@ -186,6 +113,10 @@ class Mega(object):
             user_agent (``str``, *optional*):
                 User agent to use in network requests If you pass `None` to this parameter, a default user agent will be used.
 
+            timeout (``float``, *optional*):
+                Default deadline in seconds for requests and transfers. Transfers that exceed it are
+                cancelled in the SDK. If you pass `None` to this parameter, operations can wait forever.
+
             proxy (``Dict[str, str]``, *optional*):
                 Proxy dictionary. Structure: { 'url': ..., 'username': ..., 'password': ... }.
 
@@ -195,24 +126,69 @@ class Mega(object):
                 The default behavior is to use HTTP for transfers and the persistent connection to wait for external events. Those communications don't require HTTPS because all transfer data is already end-to-end encrypted and no data is transmitted over the connection to wait for events (it's just closed when there are new events).
 
                 This feature should only be enabled if there are problems to contact MEGA servers through HTTP because otherwise it doesn't have any benefit and will cause a higher CPU usage.
-        """
 
-        self.api = MegaApi(app_key, base_path, user_agent)
+            path_cache_size (``int``):
+                Maximum number of paths kept in the path to handle index used by `get_node(...)`.
+                The index is invalidated with the node updates received from MEGA. Pass `0` to disable it.
 
-        # Push requests
+            snapshots (``bool``):
+                Return `NodeInfo` and `TransferInfo` snapshots instead of SDK objects from `walk(...)`,
+                `find_by_hash(...)` and the transfer methods. The snapshots are plain Python objects,
+                the native copies are freed as soon as the values are read.
+        """
+
+        # Validate now, the SDK is only loaded on first use
         if proxy:
             assert (
                 "url" in proxy
             ), "Proxy dictionary must contains almost the url component"
 
-            p = MegaProxy()
-            p.setProxyType(MegaProxy.PROXY_CUSTOM)
-            p.setProxyURL(proxy.get("url"))
-            p.setCredentials(proxy.get("username", None), proxy.get("password", None))
-            self.api.setProxySettings(p)
+        self._api_args = (app_key, base_path, user_agent)
+        self._proxy = proxy
+        self._http_only = http_only
+        self._api: Optional[MegaApi] = None
+
+        self.timeout = timeout
+        self.snapshots = snapshots
+        self._dispatcher: Optional[Dispatcher] = None
+        self._fetch_nodes: Optional[asyncio.Future] = None
+        self._session_dumped = False
+        self._paths = PathIndex(path_cache_size) if path_cache_size > 0 else None
+        self._hashes = HashIndex()
+        self._load_hashes: Optional[asyncio.Future] = None
+
+    @property
+    def api(self) -> MegaApi:
+        """
+        The underlying `MegaApi`, created on first use.
+        """
+        if self._api is None:
+            self._api = self._create_api()
+        return self._api
+
+    def _create_api(self) -> MegaApi:
+        api = megasdk.MegaApi(*self._api_args)
+        self._request_listener = listener.RequestListener()
+        self._transfer_listener = listener.TransferListener()
+        self._global_listener = listener.GlobalListener(
+            self._paths, self._hashes, HASH_ATTRIBUTE
+        )
+        api.addGlobalListener(self._global_listener)
+
+        # Push requests
+        if self._proxy:
+            p = megasdk.MegaProxy()
+            p.setProxyType(megasdk.MegaProxy.PROXY_CUSTOM)
+            p.setProxyURL(self._proxy.get("url"))
+            p.setCredentials(
+                self._proxy.get("username", None), self._proxy.get("password", None)
+            )
+            api.setProxySettings(p)
 
-        if http_only:
-            self.api.useHttpsOnly(http_only)
+        if self._http_only:
+            api.useHttpsOnly(self._http_only)
+
+        return api
 
     def __enter__(self) -> None:
         raise TypeError("Use async with instead")
@@ -238,17 +214,46 @@ class Mega(object):
         exc_tb: Optional[TracebackType],
     ) -> None:
         if self.is_logged_in():
-            await self.logout()
+            await self.logout(keep_session=self._session_dumped)
 
-    async def _request(self, func: Callable[[Any], None], *args) -> MegaRequest:
-        listener = _RequestListener()
-        func(*args, listener)
-        await listener.finish_event.wait()
+    def _get_dispatcher(self) -> Dispatcher:
+        loop = asyncio.get_event_loop()
+        if self._dispatcher is None or self._dispatcher.loop is not loop:
+            self._dispatcher = Dispatcher(loop)
+        return self._dispatcher
 
-        code = listener.error.getErrorCode()
-        if code != MegaError.API_OK:
-            raise MegaRequestError(code, listener.error.toString())
-        return listener.request
+    async def _request(
+        self,
+        func: Callable[[Any], None],
+        *args,
+        timeout: Optional[float] = None,
+    ) -> MegaRequest:
+        pending = self._start_request(func, *args)
+        return await self._wait_request(pending.future, timeout)
+
+    def _start_request(self, func: Callable[[Any], None], *args) -> Pending:
+        pending = listener.Pending(self._get_dispatcher())
+        self._request_listener.queued_requests.append(pending)
+        try:
+            func(*args, self._request_listener)
+        except BaseException:
+            self._request_listener.queued_requests.remove(pending)
+            raise
+        return pending
+
+    async def _wait_request(
+        self, future: Awaitable[Any], timeout: Optional[float] = None
+    ) -> Any:
+        timeout = self.timeout if timeout is None else timeout
+        if timeout is None:
+            return await future
+
+        # The SDK has no way to abort a generic request, its late result
+        # is just discarded by the listener
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise MegaTimeoutError(timeout) from None
 
     async def _transfer(
         self,
@@ -256,40 +261,113 @@ class Mega(object):
         *args,
         progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
         progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        on_data: Optional[Callable[[memoryview, int], bool]] = None,
+        on_finish: Optional[Callable[[], None]] = None,
+        timeout: Optional[float] = None,
     ) -> MegaTransfer:
-        listener = _TransferListener(progress, progress_args)
-        func(*args, listener)
-        await listener.finish_event.wait()
-
-        code = listener.error.getErrorCode()
-        if code != MegaError.API_OK:
-            raise MegaRequestError(code, listener.error.toString())
-        return listener.transfer
+        pending = self._start_transfer(
+            func,
+            *args,
+            progress=progress,
+            progress_args=progress_args,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            on_data=on_data,
+            on_finish=on_finish,
+        )
+        return await self._wait_transfer(pending, timeout)
 
-    async def get_node(self, node: Union[int, str, MegaNode]) -> MegaNode:
+    def _start_transfer(
+        self,
+        func: Callable[[Any], None],
+        *args,
+        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+        progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        on_data: Optional[Callable[[memoryview, int], bool]] = None,
+        on_finish: Optional[Callable[[], None]] = None,
+    ) -> Pending:
+        pending = listener.Pending(
+            self._get_dispatcher(),
+            progress,
+            progress_args,
+            progress_interval,
+            progress_delta,
+            on_data,
+            on_finish,
+        )
+        self._transfer_listener.queued_transfers.append(pending)
+        try:
+            func(*args, self._transfer_listener)
+        except BaseException:
+            self._transfer_listener.queued_transfers.remove(pending)
+            raise
+        return pending
+
+    async def _wait_transfer(
+        self, pending: Pending, timeout: Optional[float] = None
+    ) -> MegaTransfer:
+        # The future is shielded so a timeout or a cancellation of the
+        # awaiting task cancels the SDK transfer instead of the future
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            if timeout is None:
+                return await asyncio.shield(pending.future)
+            return await asyncio.wait_for(asyncio.shield(pending.future), timeout)
+        except asyncio.TimeoutError:
+            await self._cancel_transfer(pending)
+            raise MegaTimeoutError(timeout) from None
+        except asyncio.CancelledError:
+            await self._cancel_transfer(pending)
+            raise
+
+    async def _cancel_transfer(self, pending: Pending) -> None:
+        # If the transfer didn't start yet, the listener cancels it as soon
+        # as the SDK reports the start
+        pending.cancelled = True
+        if pending.tag is not None:
+            self.api.cancelTransferByTag(pending.tag)
+
+        # Wait until the SDK releases the transfer
+        try:
+            await pending.future
+        except MegaRequestError:
+            pass
+
+    def _transfer_result(self, transfer: MegaTransfer) -> Union[MegaTransfer, TransferInfo]:
+        # The native copy is freed once the snapshot is taken
+        return TransferInfo.from_transfer(transfer) if self.snapshots else transfer
+
+    async def get_node(self, node: Union[int, str, MegaNode, NodeInfo]) -> MegaNode:
         """
         Return the object `MegaNode` with the specified path or handle.
 
         Parameters:
-            node (``Union[in, str, MegaNode]``):
-                Path or handle to remote node.
+            node (``Union[in, str, MegaNode, NodeInfo]``):
+                Path, handle or snapshot of the remote node.
 
         Returns:
             :obj:`MegaNode`: The MegaNode object that represent the node.
         """
 
-        if not isinstance(node, MegaNode) and not self.api.isFilesystemAvailable():
-            await self._request(self.api.fetchNodes)
+        if not isinstance(node, megasdk.MegaNode):
+            await self.ensure_nodes()
 
-        if isinstance(node, MegaNode):
+        if isinstance(node, megasdk.MegaNode):
             r = node
+        elif isinstance(node, NodeInfo):
+            r = self.api.getNodeByHandle(node.handle)
+            node = node.handle
         elif isinstance(node, str):
-            r = self.api.getNodeByPath(node)
+            r = self._get_node_by_path(node)
         elif isinstance(node, int):
             r = self.api.getNodeByHandle(node)
         else:
             raise TypeError(
-                "node must be a string, integer (MegaHandler) or a MegaNode"
+                "node must be a string, integer (MegaHandler), MegaNode or NodeInfo"
             )
 
         if r is None:
@@ -297,17 +375,309 @@ class Mega(object):
 
         return r
 
-    async def login(self, email: str, password: str) -> None:
+    async def exists(self, node: Union[int, str]) -> bool:
+        """
+        Check if a node exists, without raising `MegaNodeNotFound`.
+
+        Once the nodes are loaded the check is local, and the paths go through the path index.
+
+        Parameters:
+            node (``Union[int, str]``):
+                Path or handle to remote node.
+
+        Returns:
+            :obj:`bool`: `True` if the node exists.
+        """
+
+        await self.ensure_nodes()
+        return self._find_node(node) is not None
+
+    async def stat(self, node: Union[int, str]) -> Optional[StatResult]:
+        """
+        Return the status of a node, or `None` if it doesn't exist.
+
+        Once the nodes are loaded the lookup is local, and the paths go through the path index.
+
+        Parameters:
+            node (``Union[int, str]``):
+                Path or handle to remote node.
+
+        Returns:
+            :obj:`StatResult`: Named tuple with the *handle*, *type*, *size*, *mtime* and
+            *fingerprint* of the node.
+        """
+
+        await self.ensure_nodes()
+        r = self._find_node(node)
+        return StatResult.from_node(r) if r is not None else None
+
+    def _find_node(self, node: Union[int, str]) -> Optional[MegaNode]:
+        if isinstance(node, str):
+            return self._get_node_by_path(node)
+        if isinstance(node, int):
+            return self.api.getNodeByHandle(node)
+        raise TypeError("node must be a string or integer (MegaHandler)")
+
+    async def get_nodes(self, paths: Iterable[str]) -> List[Optional[MegaNode]]:
+        """
+        Return the nodes of many paths at once.
+
+        The paths are grouped by their common prefixes, so each folder on the way is resolved
+        once and the children of a folder are listed once for all the paths below it.
+
+        Parameters:
+            paths (``Iterable[str]``):
+                Paths to remote nodes.
+
+        Returns:
+            :obj:`List[Optional[MegaNode]]`: The nodes in the same order than `paths`, with `None`
+            for the paths that don't exist.
+        """
+
+        await self.ensure_nodes()
+        paths = list(paths)
+        results: List[Optional[MegaNode]] = [None] * len(paths)
+
+        # Trie of path components, the indices of the paths ending at each
+        # entry are stored under the `None` key. Paths that can't be split in
+        # plain names, like the ones with "." or "..", are left to the SDK
+        trie: Dict[Optional[str], Any] = {}
+        for i, path in enumerate(paths):
+            key = PathIndex.normalize(path)
+            if key is None:
+                results[i] = self.api.getNodeByPath(path)
+                continue
+
+            if self._paths is not None:
+                handle = self._paths.get(key)
+                if handle is not None:
+                    results[i] = self.api.getNodeByHandle(handle)
+                    if results[i] is not None:
+                        continue
+                    self._paths.invalidate(handle)
+
+            entry = trie
+            for name in key.split("/")[1:] if key != "/" else ():
+                entry = entry.setdefault(name, {})
+            entry.setdefault(None, []).append(i)
+
+        if not trie:
+            return results
+
+        # Read after the lookups above, which can invalidate stale entries
+        generation = self._paths.generation if self._paths is not None else 0
+        resolved: Dict[str, int] = {}
+        stack = [("/", self.api.getRootNode(), trie)]
+        while stack:
+            path, node, entry = stack.pop()
+            resolved[path] = node.getHandle()
+            for i in entry.get(None, ()):
+                results[i] = node
+
+            names = [name for name in entry if name is not None]
+            if not names or node.isFile():
+                continue
+
+            prefix = path.rstrip("/") + "/"
+            for name, child in self._get_children_by_name(node, names):
+                stack.append((prefix + name, child, entry[name]))
+
+        if self._paths is not None:
+            for path in resolved:
+                chain = [(path, resolved[path])]
+                chain.extend((a, resolved[a]) for a in PathIndex.ancestors(path))
+                self._paths.put(chain, generation)
+
+        return results
+
+    def _get_children_by_name(
+        self, folder: MegaNode, names: List[str]
+    ) -> List[Tuple[str, MegaNode]]:
+        # A few names are looked up one by one, many are matched in a single
+        # pass over the children of the folder
+        if len(names) <= 4:
+            found = []
+            for name in names:
+                child = self.api.getChildNode(folder, name)
+                if child is not None:
+                    found.append((name, child))
+            return found
+
+        wanted = set(names)
+        found = []
+        children = self.api.getChildren(folder)
+        for i in range(children.size()):
+            child = children.get(i)
+            name = child.getName()
+            if name in wanted:
+                wanted.discard(name)
+                found.append((name, child.copy()))
+        return found
+
+    def _get_node_by_path(self, path: str) -> Optional[MegaNode]:
+        key = PathIndex.normalize(path) if self._paths is not None else None
+        if key is None:
+            return self.api.getNodeByPath(path)
+
+        handle = self._paths.get(key)
+        if handle is not None:
+            r = self.api.getNodeByHandle(handle)
+            if r is not None:
+                return r
+            self._paths.invalidate(handle)
+
+        generation = self._paths.generation
+        r = self.api.getNodeByPath(path)
+        if r is not None:
+            chain = self._path_chain(key, r)
+            if chain is not None:
+                self._paths.put(chain, generation)
+        return r
+
+    def _path_chain(self, path: str, node: MegaNode) -> Optional[List[Tuple[str, int]]]:
+        # Pair the path and its ancestors with their handles, walking up
+        # until an ancestor that is already in the index
+        chain = [(path, node.getHandle())]
+        handle = node.getParentHandle()
+        for ancestor in PathIndex.ancestors(path):
+            chain.append((ancestor, handle))
+            if ancestor == "/" or self._paths.cached(ancestor, handle):
+                break
+
+            node = self.api.getNodeByHandle(handle)
+            if node is None:
+                return None
+            handle = node.getParentHandle()
+        return chain
+
+    def path_cache_info(self) -> CacheInfo:
+        """
+        Return statistics of the path index used by `get_node(...)`.
+
+        Returns:
+            :obj:`CacheInfo`: Named tuple with the *hits*, *misses*, *maxsize* and *currsize* of the index.
+        """
+
+        if self._paths is None:
+            return CacheInfo(0, 0, 0, 0)
+        return self._paths.info()
+
+    async def ensure_nodes(self, timeout: Optional[float] = None) -> None:
+        """
+        Fetch the filesystem of the account if it isn't available yet.
+
+        Concurrent callers share a single in-flight fetch. Call it right after the login to
+        pay the cost of the fetch once at startup instead of in the first lookup.
+
+        Parameters:
+            timeout (``float``, *optional*):
+                Deadline in seconds to wait for the fetch, by default the client timeout. When
+                exceeded `MegaTimeoutError` is raised, but the fetch goes on and the next
+                callers wait for the same one.
+        """
+
+        if self.api.isFilesystemAvailable():
+            return
+
+        if self._fetch_nodes is None:
+            if self._paths is not None:
+                self._paths.clear()
+            self._hashes.clear()
+            # Shared without a deadline, it's only finished when the SDK says so
+            self._fetch_nodes = self._start_request(self.api.fetchNodes).future
+            self._fetch_nodes.add_done_callback(self._on_nodes_fetched)
+
+        # A cancelled or timed out caller must not cancel the fetch of the others
+        await self._wait_request(asyncio.shield(self._fetch_nodes), timeout)
+
+    def _on_nodes_fetched(self, fut: asyncio.Future) -> None:
+        # Allow a new fetch after a failure or a new login. The error is raised
+        # to the waiters, if all of them gave up it's dropped
+        self._fetch_nodes = None
+        if not fut.cancelled():
+            fut.exception()
+
+    async def login(
+        self, email: str, password: str, timeout: Optional[float] = None
+    ) -> None:
         """
         Log in to a MEGA account.
+
+        Parameters:
+            email (``str``):
+                Email of the account.
+
+            password (``str``):
+                Password of the account.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
         """
-        await self._request(self.api.login, email, password)
+        await self._request(self.api.login, email, password, timeout=timeout)
 
-    async def logout(self) -> None:
+    async def resume(
+        self, session: str, fetch_nodes: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        """
+        Resume a session dumped with `dump_session(...)`.
+
+        It skips the key derivation done by `login(...)`. If the client was created with a
+        `base_path`, the nodes are loaded from the local cache and only the changes since the
+        last run are fetched from MEGA.
+
+        Parameters:
+            session (``str``):
+                Session key returned by `dump_session(...)`.
+
+            fetch_nodes (``bool``, *optional*):
+                Load the filesystem right away, like `ensure_nodes(...)`.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the login, and then for the fetch of the nodes, by
+                default the client timeout. When exceeded `MegaTimeoutError` is raised.
+        """
+        await self._request(self.api.fastLogin, session, timeout=timeout)
+        if fetch_nodes:
+            await self.ensure_nodes(timeout)
+
+    def dump_session(self) -> Optional[str]:
+        """
+        Return the session key of the current login.
+
+        Keep it in a safe place, it gives full access to the account. Use `resume(...)` to
+        log in again with it and `logout(...)` to invalidate it. Once a session is dumped,
+        leaving the `async with` block of the client keeps it valid.
+
+        Returns:
+            :obj:`str`: The session key, or `None` if not logged in.
+        """
+        session = self.api.dumpSession()
+        self._session_dumped = session is not None
+        return session
+
+    async def logout(
+        self, keep_session: bool = False, timeout: Optional[float] = None
+    ) -> None:
         """
         Logout of the MEGA account invalidating the session.
+
+        Parameters:
+            keep_session (``bool``, *optional*):
+                Only close the session locally, so it can be resumed later with `resume(...)`.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
         """
-        await self._request(self.api.logout)
+        if keep_session:
+            await self._request(self.api.localLogout, timeout=timeout)
+        else:
+            await self._request(self.api.logout, timeout=timeout)
+        self._session_dumped = False
+        if self._paths is not None:
+            self._paths.clear()
+        self._hashes.clear()
 
     def is_logged_in(self) -> bool:
         """
@@ -316,6 +686,8 @@ class Mega(object):
         Returns:
             :obj:`bool`: `False` if not logged in, Otherwise, a `True`.
         """
+        if self._api is None:
+            return False
         return True if self.api.isLoggedIn() > 0 else False
 
     def is_online(self) -> bool:
@@ -329,19 +701,229 @@ class Mega(object):
         """
         return self.api.isOnline()
 
-    async def account_details(self) -> MegaAccountDetails:
+    async def account_details(self, timeout: Optional[float] = None) -> MegaAccountDetails:
         """
         Get details about the MEGA account.
 
+        Parameters:
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
+
         Returns:
             :obj:`MegaAccountDetails`: Object with account details.
         """
 
-        req = await self._request(self.api.getAccountDetails)
+        req = await self._request(self.api.getAccountDetails, timeout=timeout)
         return req.getMegaAccountDetails()
 
+    async def children(
+        self,
+        node: Union[int, str, MegaNode] = "/",
+        order: Union[int, str] = "none",
+    ) -> NodeSequence:
+        """
+        Return the children of a folder, sorted by the SDK.
+
+        The SDK objects are only converted into Python ones when accessed, so taking the first
+        items of a big folder doesn't copy the rest.
+
+        Parameters:
+            node (``Union[int, str, MegaNode]``, *optional*):
+                Parent folder, by default the root.
+
+            order (``Union[int, str]``, *optional*):
+                One of the `MegaApi.ORDER_*` constants, or its name without the prefix, like
+                `"default_asc"`, `"size_desc"` or `"modification_desc"`.
+
+        Returns:
+            :obj:`NodeSequence`: Return a lazy sequence of `MegaNode` (or `NodeInfo` with
+            `snapshots`) that supports indexing and slicing.
+
+        Example:
+            .. code-block:: python
+
+                ...
+                largest = (await mega.children("/videos", order="size_desc"))[:100]
+                for node in largest:
+                    print(node.getName(), node.getSize())
+                ...
+        """
+
+        if isinstance(order, str):
+            try:
+                order = getattr(megasdk.MegaApi, "ORDER_" + order.upper())
+            except AttributeError:
+                raise ValueError("Invalid order {!r}".format(order)) from None
+
+        node = await self.get_node(node)
+        return NodeSequence(
+            self.api.getChildren(node, order),
+            NodeInfo.from_node if self.snapshots else None,
+        )
+
+    async def walk(
+        self,
+        node: Union[int, str, MegaNode] = "/",
+        batch_size: int = 1000,
+        concurrency: int = 0,
+    ) -> Generator[Tuple[str, List[MegaNode], List[MegaNode]], None, None]:
+        """
+        Walk a folder tree level by level, like `os.walk(...)`.
+
+        For each folder it yields its path and the lists of its child folders and files. As in
+        `os.walk(...)`, removing entries from the list of folders prunes the walk.
+
+        Parameters:
+            node (``Union[int, str, MegaNode]``, *optional*):
+                Folder where the walk starts, by default the root.
+
+            batch_size (``int``, *optional*):
+                Amount of children processed before giving the control back to the event loop.
+
+            concurrency (``int``, *optional*):
+                Number of folders listed at the same time in worker threads. By default the
+                folders are listed in the event loop thread, one batch at a time.
+
+        Returns:
+            :obj:`Generator[Tuple[str, List[MegaNode], List[MegaNode]]]`: Return a generator of
+            the path, folders and files of each folder.
+
+        Example:
+            .. code-block:: python
+
+                ...
+                async for path, folders, files in mega.walk("/photos"):
+                    for file in files:
+                        print(path, file.getName(), file.getSize())
+                ...
+        """
+
+        node = await self.get_node(node)
+        queue = collections.deque([(self.api.getNodePath(node), node)])
+        listings: Deque[Tuple[str, asyncio.Future]] = collections.deque()
+
+        try:
+            while queue or listings:
+                # Keep up to `concurrency` listings in flight, in walk order
+                while queue and len(listings) < max(1, concurrency):
+                    path, folder = queue.popleft()
+                    listing = asyncio.ensure_future(
+                        self._list_folder(folder, batch_size, concurrency > 0)
+                    )
+                    listings.append((path, listing))
+
+                path, listing = listings.popleft()
+                folders, files = await listing
+                yield path, folders, files
+
+                prefix = path.rstrip("/") + "/"
+                if self.snapshots:
+                    queue.extend((prefix + f.name, f) for f in folders)
+                else:
+                    queue.extend((prefix + f.getName(), f) for f in folders)
+        finally:
+            for _, listing in listings:
+                listing.cancel()
+            await asyncio.gather(*(l for _, l in listings), return_exceptions=True)
+
+    async def _list_folder(
+        self, folder: Union[MegaNode, NodeInfo], batch_size: int, threaded: bool
+    ) -> Tuple[List[MegaNode], List[MegaNode]]:
+        def children_of() -> MegaNodeList:
+            node = folder
+            if isinstance(node, NodeInfo):
+                node = self.api.getNodeByHandle(node.handle)
+                if node is None:
+                    return None
+            return self.api.getChildren(node)
+
+        def split(children, start: int, end: int) -> None:
+            for i in range(start, end):
+                child = children.get(i)
+                if self.snapshots:
+                    child = NodeInfo.from_node(child)
+                    (folders if child.is_folder() else files).append(child)
+                else:
+                    child = child.copy()
+                    (folders if child.isFolder() else files).append(child)
+
+        folders: List[MegaNode] = []
+        files: List[MegaNode] = []
+
+        if threaded:
+
+            def run() -> None:
+                children = children_of()
+                if children is not None:
+                    split(children, 0, children.size())
+
+            await asyncio.get_event_loop().run_in_executor(None, run)
+            return folders, files
+
+        children = children_of()
+        size = children.size() if children is not None else 0
+        for start in range(0, size, batch_size):
+            split(children, start, min(start + batch_size, size))
+            if start + batch_size < size:
+                await asyncio.sleep(0)
+        return folders, files
+
+    async def export_tree(
+        self,
+        node: Union[int, str, MegaNode] = "/",
+        format: Optional[str] = None,
+    ) -> Any:
+        """
+        Export the metadata of a node and every node below it by columns.
+
+        The columns are the *handle*, *parent* handle, *type*, *size*, *ctime*, *mtime* and
+        *name* of each node, in breadth-first order. The tree is walked in a worker thread and
+        the values go straight into typed buffers, with the names concatenated in one buffer.
+
+        Parameters:
+            node (``Union[int, str, MegaNode]``, *optional*):
+                Node where the export starts, by default the root.
+
+            format (``str``, *optional*):
+                `"arrow"` to get a `pyarrow.Table`, `"numpy"` to get a dictionary of NumPy arrays,
+                with the names as a `uint8` array plus a `name_offsets` array, or `"columns"` to get
+                the raw `TreeColumns`. By default `"arrow"` if PyArrow is installed, otherwise
+                `"numpy"`.
+
+        Returns:
+            :obj:`Any`: Return the columns in the requested format.
+
+        Example:
+            .. code-block:: python
+
+                ...
+                table = await mega.export_tree("/", format="arrow")
+                print(pyarrow.compute.sum(table["size"]))
+                ...
+        """
+
+        if format is None:
+            format = "arrow" if importlib.util.find_spec("pyarrow") else "numpy"
+        if format not in ("arrow", "numpy", "columns"):
+            raise ValueError("Invalid export format {!r}".format(format))
+
+        node = await self.get_node(node)
+        columns = await asyncio.get_event_loop().run_in_executor(
+            None, scan_tree, self.api, node
+        )
+
+        if format == "arrow":
+            return to_arrow(columns)
+        if format == "numpy":
+            return to_numpy(columns)
+        return columns
+
     async def create_folder(
-        self, name: str, parent: Union[int, str, MegaNode] = "/"
+        self,
+        name: str,
+        parent: Union[int, str, MegaNode] = "/",
+        timeout: Optional[float] = None,
     ) -> int:
         """
         Create a folder in the MEGA account.
@@ -353,15 +935,21 @@ class Mega(object):
             parent (``Union[in, str, MegaNode]``):
                 Parent folder.
 
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
+
         Returns:
             :obj:`int`: Handle of the new folder.
         """
 
         parent = await self.get_node(parent)
-        req = await self._request(self.api.createFolder, name, parent)
+        req = await self._request(self.api.createFolder, name, parent, timeout=timeout)
         return req.getNodeHandle()
 
-    async def remove(self, node: Union[int, str, MegaNode]) -> None:
+    async def remove(
+        self, node: Union[int, str, MegaNode], timeout: Optional[float] = None
+    ) -> None:
         """
         Remove a node from the MEGA account.
 
@@ -373,10 +961,14 @@ class Mega(object):
         Parameters:
             node (``Union[in, str, MegaNode]``):
                 Node to remove.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
         """
 
         node = await self.get_node(node)
-        await self._request(self.api.remove, node)
+        await self._request(self.api.remove, node, timeout=timeout)
 
     async def upload(
         self,
@@ -385,7 +977,13 @@ class Mega(object):
         filename: Optional[str] = None,
         progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
         progress_args: Optional[Tuple] = (),
-    ) -> MegaTransfer:
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        timeout: Optional[float] = None,
+        content_hash: bool = False,
+        dedupe: bool = False,
+        hash_cache: Optional[FingerprintCache] = None,
+    ) -> Optional[MegaTransfer]:
         """
         Upload a file or folder with a custom name.
 
@@ -409,8 +1007,33 @@ class Mega(object):
                 Extra custom arguments for the progress callback function.
                 You can pass anything you need to be available in the progress callback scope.
 
+            progress_interval (``float``, *optional*):
+                Minimum time in seconds between two calls of the progress callback. Updates
+                received meanwhile are coalesced and only the latest one is reported.
+
+            progress_delta (``int``, *optional*):
+                Minimum amount of bytes transmitted between two calls of the progress callback.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the transfer, by default the client timeout. When exceeded the
+                transfer is cancelled and `MegaTimeoutError` is raised. The same deadline applies
+                to the requests that store the hash or copy a duplicate.
+
+            content_hash (``bool``, *optional*):
+                Compute the SHA-256 of the file while it's uploaded, and store it in the `sha256`
+                custom attribute of the new node, so it can be found with `find_by_hash(...)`.
+
+            dedupe (``bool``, *optional*):
+                Compute the SHA-256 of the file before uploading it, and if a file with the same
+                content is already in the account copy that node instead of uploading the data.
+                Implies `content_hash`.
+
+            hash_cache (``FingerprintCache``, *optional*):
+                Cache of the content hashes of the local files.
+
         Returns:
-            :obj:`MegaTransfer`: An object with information about the transference.
+            :obj:`MegaTransfer`: An object with information about the transference (a `TransferInfo`
+            with `snapshots`), or `None` if the file was deduplicated with a copy of an existing node.
 
         Other Parameters:
             current (``int``):
@@ -439,16 +1062,114 @@ class Mega(object):
 
         parent = await self.get_node(parent)
         filename = filename or os.path.basename(local_path)
-        transfer = await self._transfer(
-            self.api.startUpload,
-            local_path,
-            parent,
-            filename,
-            progress=progress,
-            progress_args=progress_args,
-        )
 
-        return transfer
+        digest = None
+        if (content_hash or dedupe) and os.path.isfile(local_path):
+            digest = asyncio.ensure_future(self._content_hash(local_path, hash_cache))
+
+        try:
+            if dedupe and digest is not None:
+                size = os.path.getsize(local_path)
+                for node in await self._find_by_hash(await digest):
+                    if node.getSize() == size:
+                        await self.copy_node(node, parent, filename, timeout=timeout)
+                        return None
+
+            # The hash is computed meanwhile in a worker thread
+            transfer = await self._transfer(
+                self.api.startUpload,
+                local_path,
+                parent,
+                filename,
+                progress=progress,
+                progress_args=progress_args,
+                progress_interval=progress_interval,
+                progress_delta=progress_delta,
+                timeout=timeout,
+            )
+
+            if digest is not None:
+                node = self.api.getNodeByHandle(transfer.getNodeHandle())
+                if node is not None:
+                    await self._request(
+                        self.api.setCustomNodeAttribute,
+                        node,
+                        HASH_ATTRIBUTE,
+                        await digest,
+                        timeout=timeout,
+                    )
+        finally:
+            if digest is not None and not digest.done():
+                digest.cancel()
+
+        return self._transfer_result(transfer)
+
+    async def find_by_hash(self, digest: str) -> List[MegaNode]:
+        """
+        Find the files whose content has the SHA-256 `digest`.
+
+        Only the files uploaded with `content_hash` or `dedupe` have the hash. The account is
+        scanned once on the first call, then the index is kept up to date with the node updates.
+
+        Parameters:
+            digest (``str``):
+                SHA-256 of the content, in hexadecimal.
+
+        Returns:
+            :obj:`List[MegaNode]`: The nodes with that content.
+        """
+        nodes = await self._find_by_hash(digest)
+        if self.snapshots:
+            return [NodeInfo.from_node(node) for node in nodes]
+        return nodes
+
+    async def _find_by_hash(self, digest: str) -> List[MegaNode]:
+        if not self._hashes.loaded:
+            await self.ensure_nodes()
+            if self._load_hashes is None:
+                self._load_hashes = asyncio.ensure_future(self._scan_hashes())
+                self._load_hashes.add_done_callback(self._on_hashes_loaded)
+
+            # A cancelled caller must not cancel the scan of the others
+            await asyncio.shield(self._load_hashes)
+
+        nodes = []
+        for handle in self._hashes.get(digest.lower()):
+            node = self.api.getNodeByHandle(handle)
+            if node is not None:
+                nodes.append(node)
+        return nodes
+
+    async def _scan_hashes(self) -> None:
+        def scan() -> List[Tuple[int, str]]:
+            items = []
+            stack = [self.api.getRootNode()]
+            while stack:
+                children = self.api.getChildren(stack.pop())
+                for i in range(children.size()):
+                    node = children.get(i)
+                    if node.isFolder():
+                        stack.append(node.copy())
+                        continue
+                    digest = node.getCustomAttr(HASH_ATTRIBUTE)
+                    if digest:
+                        items.append((node.getHandle(), digest))
+            return items
+
+        # The SDK calls are local, but the whole tree can be big
+        generation = self._hashes.generation
+        items = await asyncio.get_event_loop().run_in_executor(None, scan)
+        self._hashes.load(items, generation)
+
+    def _on_hashes_loaded(self, fut: asyncio.Future) -> None:
+        self._load_hashes = None
+
+    async def _content_hash(
+        self, path: str, cache: Optional[FingerprintCache] = None
+    ) -> str:
+        if cache is not None:
+            return await cache.get(path, content_hash, SHA256)
+        return await asyncio.get_event_loop().run_in_executor(None, content_hash, path)
 
     async def download(
         self,
@@ -456,6 +1177,9 @@ class Mega(object):
         local_path: str,
         progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
         progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        timeout: Optional[float] = None,
     ) -> MegaTransfer:
         """
         Download a file or a folder from MEGA.
@@ -481,8 +1205,20 @@ class Mega(object):
                 Extra custom arguments for the progress callback function.
                 You can pass anything you need to be available in the progress callback scope.
 
+            progress_interval (``float``, *optional*):
+                Minimum time in seconds between two calls of the progress callback. Updates
+                received meanwhile are coalesced and only the latest one is reported.
+
+            progress_delta (``int``, *optional*):
+                Minimum amount of bytes transmitted between two calls of the progress callback.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the transfer, by default the client timeout. When exceeded the
+                transfer is cancelled and `MegaTimeoutError` is raised.
+
         Returns:
-            :obj:`MegaTransfer`: An object with information about the transference.
+            :obj:`MegaTransfer`: An object with information about the transference (a `TransferInfo`
+            with `snapshots`).
 
         Other Parameters:
             current (``int``):
@@ -516,9 +1252,118 @@ class Mega(object):
             local_path,
             progress=progress,
             progress_args=progress_args,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            timeout=timeout,
         )
 
-        return transfer
+        return self._transfer_result(transfer)
+
+    async def sync(
+        self,
+        local_dir: str,
+        remote_node: Union[int, str, MegaNode],
+        direction: str = "upload",
+        delete: bool = False,
+        permanent: bool = False,
+        dry_run: bool = False,
+        concurrency: int = 8,
+        fingerprint_cache: Optional[FingerprintCache] = None,
+        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+        progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        timeout: Optional[float] = None,
+    ) -> SyncPlan:
+        """
+        Synchronize a local folder with a folder in MEGA, transferring only what changed.
+
+        Files on both sides are compared by size and modification time, and by the CRC of
+        the content (the part of the SDK fingerprint without the time) when only the
+        modification time differs. Missing folders are transferred as a whole. Local symbolic
+        links are skipped, and the remote nodes in their place are left untouched.
+
+        Parameters:
+            local_dir (``str``):
+                Local folder.
+
+            remote_node (``Union[int, str, MegaNode]``):
+                Folder in MEGA.
+
+            direction (``str``, *optional*):
+                `"upload"` to make the remote folder like the local one, `"download"` for the
+                opposite, or `"both"` to copy the missing files to each side and keep the most
+                recently modified version of the changed ones.
+
+            delete (``bool``, *optional*):
+                Delete the files of the destination that don't exist in the source. Not
+                allowed when the direction is `"both"`. Remote nodes are moved to the Rubbish
+                Bin.
+
+            permanent (``bool``, *optional*):
+                Remove the deleted remote nodes permanently, with their versions, instead of
+                moving them to the Rubbish Bin.
+
+            dry_run (``bool``, *optional*):
+                Only compute the plan, without transferring or deleting anything.
+
+            concurrency (``int``, *optional*):
+                Maximum number of transfers at the same time.
+
+            fingerprint_cache (``FingerprintCache``, *optional*):
+                Persistent cache of the local CRCs, so the next syncs only read again
+                the files that changed.
+
+            progress (``callable``, *optional*):
+                Pass a callback function to view the aggregated progress of the transfers, see
+                `TransferManager`.
+
+            progress_args (``tuple``, *optional*):
+                Extra custom arguments for the progress callback function.
+
+            progress_interval (``float``, *optional*):
+                Minimum time in seconds between two progress updates of each transfer.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for each transfer and each delete, by default the client
+                timeout.
+
+        Returns:
+            :obj:`SyncPlan`: Return the planned actions, the bytes that didn't need to be
+            transferred, and the errors of the actions that failed.
+
+        Example:
+            .. code-block:: python
+
+                ...
+                plan = await mega.sync("/home/me/photos", "/photos", dry_run=True)
+                print(plan.bytes_to_transfer, plan.bytes_saved)
+
+                plan = await mega.sync("/home/me/photos", "/photos", delete=True)
+                for action, exc in plan.errors:
+                    print(action.path, exc)
+                ...
+        """
+
+        remote_node = await self.get_node(remote_node)
+        if not remote_node.isFolder():
+            raise ValueError("The remote node isn't a folder")
+
+        plan = await plan_sync(
+            self, local_dir, remote_node, direction, delete, fingerprint_cache
+        )
+        if dry_run:
+            return plan
+
+        return await run_sync(
+            self,
+            plan,
+            permanent=permanent,
+            concurrency=concurrency,
+            progress=progress,
+            progress_args=progress_args,
+            progress_interval=progress_interval,
+            timeout=timeout,
+        )
 
     async def streaming(
         self,
@@ -528,13 +1373,18 @@ class Mega(object):
         chunk_size: int = 2097152,
         progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
         progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        timeout: Optional[float] = None,
+        buffer_size: int = 8388608,
     ) -> Generator[bytes, None, None]:
         """
-        [WARNING]: Worst performance, use download
-
         Start an streaming download for a file in MEGA. This return an iterator over the chunks
         of the file.
 
+        The data goes through an in-memory buffer between the SDK and the event loop. To store
+        the file on disk prefer `download(...)`, that doesn't go through Python.
+
         Parameters:
             node (``Union[int, str, MegaNode]``):
                 Node that identifies the file or folder.
@@ -543,11 +1393,11 @@ class Mega(object):
                 First byte to download from the file.
 
             limit (``int``):
-                Size of the data to download.
+                Size of the data to download. By default (and at most) until the end of the file.
 
             chunk_size (``int``):
-                Size of the byte chunks returned by the generator. The last chunk can have
-                less bytes than the specified here.
+                Maximum size of the byte chunks returned by the generator. A chunk has less
+                bytes than the specified here when the SDK didn't deliver more yet.
 
             progress (``callable``, *optional*):
                 Pass a callback function to view the file transmission progress.
@@ -560,6 +1410,25 @@ class Mega(object):
                 Extra custom arguments for the progress callback function.
                 You can pass anything you need to be available in the progress callback scope.
 
+            progress_interval (``float``, *optional*):
+                Minimum time in seconds between two calls of the progress callback. Updates
+                received meanwhile are coalesced and only the latest one is reported.
+
+            progress_delta (``int``, *optional*):
+                Minimum amount of bytes transmitted between two calls of the progress callback.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the transfer, by default the client timeout. When exceeded the
+                transfer is cancelled and `MegaTimeoutError` is raised.
+
+            buffer_size (``int``, *optional*):
+                Size of the buffer between the SDK and the generator, allocated once per stream.
+                The transfer is paused when the buffer is 3/4 full and resumed when the consumer
+                drains it to 1/4, so a slow consumer never blocks the SDK threads. If the SDK
+                refuses to pause it, or keeps sending more than another `buffer_size` bytes (at
+                least 16 MiB) after the pause, the stream fails with `MegaRequestError` or
+                `MegaBufferOverflowError`.
+
         Returns:
             :obj:`Generator[bytes]`: Return a generator to get file data
 
@@ -589,39 +1458,483 @@ class Mega(object):
                         file.write(chunk)
                 ...
         """
+        stream = self._streaming(
+            node,
+            offset,
+            limit,
+            lambda buffer: buffer.read(chunk_size),
+            progress=progress,
+            progress_args=progress_args,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            timeout=timeout,
+            buffer_size=buffer_size,
+        )
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    async def streaming_into(
+        self,
+        node: Union[int, str, MegaNode],
+        buffer: Union[bytearray, memoryview],
+        offset: int = 0,
+        limit: int = None,
+        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+        progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        timeout: Optional[float] = None,
+        buffer_size: int = 8388608,
+    ) -> Generator[int, None, None]:
+        """
+        Start an streaming download for a file in MEGA that fills `buffer` in place instead
+        of allocating a new chunk each time.
+
+        Each iteration copies the next data into the start of `buffer` and yields the amount of
+        bytes copied. The data must be consumed before the next iteration overwrites it.
+
+        Parameters:
+            node (``Union[int, str, MegaNode]``):
+                Node that identifies the file or folder.
+
+            buffer (``Union[bytearray, memoryview]``):
+                Writable object supporting the buffer protocol, like a `bytearray`, a `memoryview`
+                or a NumPy array. Its size is the maximum size of each chunk.
+
+            offset (``int``):
+                First byte to download from the file.
+
+            limit (``int``):
+                Size of the data to download. By default (and at most) until the end of the file.
+
+            progress (``callable``, *optional*):
+                Pass a callback function to view the file transmission progress, like in
+                `streaming(...)`.
+
+            progress_args (``tuple``, *optional*):
+                Extra custom arguments for the progress callback function.
+
+            progress_interval (``float``, *optional*):
+                Minimum time in seconds between two calls of the progress callback.
+
+            progress_delta (``int``, *optional*):
+                Minimum amount of bytes transmitted between two calls of the progress callback.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the transfer, by default the client timeout.
+
+            buffer_size (``int``, *optional*):
+                Size of the buffer between the SDK and the generator, like in `streaming(...)`.
+
+        Returns:
+            :obj:`Generator[int]`: Return a generator of the amount of bytes copied into `buffer`.
+
+        Example:
+            .. code-block:: python
+
+                ...
+                buffer = bytearray(2097152)
+                view = memoryview(buffer)
+
+                with open("file", "wb") as file:
+                    async for n in mega.streaming_into("/path/to/file", buffer):
+                        file.write(view[:n])
+                ...
+        """
+        view = memoryview(buffer).cast("B")
+        if view.readonly:
+            raise TypeError("The buffer must be writable")
+        if not view:
+            raise ValueError("The buffer is empty")
+
+        stream = self._streaming(
+            node,
+            offset,
+            limit,
+            lambda buffer: buffer.readinto(view),
+            progress=progress,
+            progress_args=progress_args,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            timeout=timeout,
+            buffer_size=buffer_size,
+        )
+        try:
+            async for n in stream:
+                yield n
+        finally:
+            await stream.aclose()
+
+    async def download_to_buffer(
+        self,
+        node: Union[int, str, MegaNode],
+        buffer: Optional[Union[bytearray, memoryview]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+        progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Union[bytearray, memoryview]:
+        """
+        Download a file in MEGA into memory.
+
+        The destination is allocated once with the size of the file, or supplied by the caller,
+        and the SDK writes the data straight into it, without intermediate chunks.
+
+        Parameters:
+            node (``Union[int, str, MegaNode]``):
+                Node that identifies the file.
+
+            buffer (``Union[bytearray, memoryview]``, *optional*):
+                Writable object supporting the buffer protocol, like a `bytearray`, a `memoryview`
+                or a NumPy array, where the data is stored. By default a new `bytearray`.
+
+            offset (``int``):
+                First byte to download from the file.
+
+            limit (``int``, *optional*):
+                Size of the data to download. By default until the end of the file, or the size
+                of `buffer` if it's smaller.
+
+            progress (``callable``, *optional*):
+                Pass a callback function to view the file transmission progress, like in
+                `streaming(...)`.
+
+            progress_args (``tuple``, *optional*):
+                Extra custom arguments for the progress callback function.
+
+            progress_interval (``float``, *optional*):
+                Minimum time in seconds between two calls of the progress callback.
+
+            progress_delta (``int``, *optional*):
+                Minimum amount of bytes transmitted between two calls of the progress callback.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the transfer, by default the client timeout.
+
+        Returns:
+            :obj:`Union[bytearray, memoryview]`: Return the new `bytearray` with the data, or a
+            `memoryview` of the filled part of `buffer`.
+
+        Example:
+            .. code-block:: python
+
+                ...
+                data = await mega.download_to_buffer("/path/to/file")
+                ...
+        """
         node = await self.get_node(node)
+        size = max(0, node.getSize() - offset)
+        if limit is not None:
+            size = min(size, limit)
 
-        # Implemented streaming
-        listener = _TransferStreamingListener(progress, progress_args)
-        limit = limit or node.getSize()
-        self.api.startStreaming(node, offset, limit, listener)
+        if buffer is None:
+            result = bytearray(size)
+            view = memoryview(result)
+        else:
+            view = memoryview(buffer).cast("B")
+            if view.readonly:
+                raise TypeError("The buffer must be writable")
+            view = view[: min(size, len(view))]
 
-        loop = listener.loop
-        reader = asyncio.StreamReader(loop=loop)
-        reader_protocol = asyncio.StreamReaderProtocol(reader)
+        n = await self._stream_into(
+            node,
+            offset,
+            view,
+            timeout,
+            progress=progress,
+            progress_args=progress_args,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+        )
+
+        if buffer is not None:
+            return view[:n]
+        view.release()
+        del result[n:]
+        return result
+
+    async def _streaming(
+        self,
+        node: Union[int, str, MegaNode],
+        offset: int,
+        limit: Optional[int],
+        read: Callable[[RingBuffer], Awaitable[Any]],
+        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+        progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        timeout: Optional[float] = None,
+        buffer_size: int = 8388608,
+    ) -> Generator[Any, None, None]:
+        node = await self.get_node(node)
 
-        # Setup pipe
-        # FIX: Use no-block call in write pipe side using some schedule form
-        with os.fdopen(listener.pipein, "rb") as pipe:
-            await loop.connect_read_pipe(lambda: reader_protocol, pipe)
+        # The range is clamped to the end of the file, like in `download_to_buffer`
+        size = max(0, node.getSize() - offset)
+        limit = min(limit, size) if limit else size
+        if limit == 0:
+            return
+
+        # Implemented streaming. The SDK thread never blocks on the buffer,
+        # the transfer is paused instead while the consumer is behind
+        dispatcher = self._get_dispatcher()
+        buffer = RingBuffer(
+            max(1, min(buffer_size, limit)),
+            dispatcher,
+            pause=lambda: dispatcher.call_soon(
+                asyncio.ensure_future, self._pause_streaming(pending, buffer, True)
+            ),
+            resume=lambda: dispatcher.call_soon(
+                asyncio.ensure_future, self._pause_streaming(pending, buffer, False)
+            ),
+        )
+        pending = self._start_transfer(
+            self.api.startStreaming,
+            node,
+            offset,
+            limit,
+            progress=progress,
+            progress_args=progress_args,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            on_data=buffer.write,
+            on_finish=buffer.close,
+        )
+        transfer = asyncio.ensure_future(self._wait_transfer(pending, timeout))
 
+        try:
             # Main loop to generate all chunks
-            while not reader.at_eof():
-                chunk = await reader.read(chunk_size)
+            while True:
+                chunk = await read(buffer)
+                if not chunk:
+                    break
                 yield chunk
 
-        # Wait to transfer finish event
-        await listener.finish_event.wait()
+            # Wait to transfer finish event
+            await transfer
+        finally:
+            # The consumer stopped early or was cancelled, drop the buffered data
+            buffer.abort()
+            if not transfer.done():
+                transfer.cancel()
+                try:
+                    await transfer
+                except asyncio.CancelledError:
+                    pass
+            elif not transfer.cancelled():
+                # Already reported by the buffer if the stream failed
+                transfer.exception()
+
+    async def _pause_streaming(
+        self, pending: Pending, buffer: RingBuffer, pause: bool
+    ) -> None:
+        try:
+            await self._request(self.api.pauseTransferByTag, pending.tag, pause)
+        except MegaRequestError as exc:
+            # The buffer can't keep up with a transfer that isn't paused, so the
+            # stream is stopped (and the transfer cancelled) right away
+            buffer.fail(
+                MegaRequestError(
+                    exc.code,
+                    "The stream couldn't be {}: {}".format(
+                        "paused" if pause else "resumed", exc.message
+                    ),
+                )
+            )
+        except MegaTimeoutError as exc:
+            buffer.fail(exc)
+
+    async def parallel_streaming(
+        self,
+        node: Union[int, str, MegaNode],
+        offset: int = 0,
+        limit: Optional[int] = None,
+        connections: int = 4,
+        block_size: int = 16777216,
+        memory_budget: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Generator[bytearray, None, None]:
+        """
+        Stream a range of a file with several concurrent connections.
+
+        The range is split in blocks that are streamed concurrently and yielded in order.
+        Blocks that arrive out of order wait in memory, and no more blocks are started than
+        the ones that fit in `memory_budget`.
+
+        Parameters:
+            node (``Union[int, str, MegaNode]``):
+                Node that identifies the file.
+
+            offset (``int``):
+                First byte to download from the file.
+
+            limit (``int``, *optional*):
+                Size of the data to download. By default until the end of the file.
+
+            connections (``int``, *optional*):
+                Maximum number of blocks streamed at the same time.
+
+            block_size (``int``, *optional*):
+                Size of each block. The last block can have less bytes than the specified here.
+
+            memory_budget (``int``, *optional*):
+                Maximum amount of bytes held by the downloaded and in-flight blocks. By default
+                twice `connections` blocks.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for each block, by default the client timeout.
+
+        Returns:
+            :obj:`Generator[bytearray]`: Return a generator of the blocks of the file, in order.
+
+        Example:
+            .. code-block:: python
+
+                ...
+                with open("file", "wb") as file:
+                    async for block in mega.parallel_streaming("/path/to/file", connections=8):
+                        file.write(block)
+                ...
+        """
+        node = await self.get_node(node)
+        end = node.getSize()
+        if limit is not None:
+            end = min(offset + limit, end)
+        memory_budget = memory_budget or 2 * connections * block_size
+        window = max(1, memory_budget // block_size)
+
+        semaphore = asyncio.Semaphore(connections)
+
+        async def fetch(start: int, size: int) -> bytearray:
+            async with semaphore:
+                block = bytearray(size)
+                with memoryview(block) as view:
+                    n = await self._stream_into(node, start, view, timeout)
+                del block[n:]
+                return block
+
+        blocks = (
+            (start, min(block_size, end - start))
+            for start in range(offset, end, block_size)
+        )
+        tasks: Deque[asyncio.Future] = collections.deque(
+            asyncio.ensure_future(fetch(*b)) for b in itertools.islice(blocks, window)
+        )
+
+        try:
+            while tasks:
+                block = await tasks.popleft()
+
+                # Keep the window full while the consumer handles this block
+                b = next(blocks, None)
+                if b is not None:
+                    tasks.append(asyncio.ensure_future(fetch(*b)))
+                yield block
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def open(
+        self,
+        node: Union[int, str, MegaNode],
+        block_size: int = 1048576,
+        cache_size: int = 32,
+        read_ahead: int = 4,
+        timeout: Optional[float] = None,
+    ) -> RemoteFile:
+        """
+        Open a remote file for random access.
 
-        code = listener.error.getErrorCode()
-        if code != MegaError.API_OK:
-            raise MegaRequestError(code, listener.error.toString())
+        Parameters:
+            node (``Union[int, str, MegaNode]``):
+                Node that identifies the file.
+
+            block_size (``int``, *optional*):
+                Size of the blocks fetched from the file.
+
+            cache_size (``int``, *optional*):
+                Maximum number of blocks kept in memory.
+
+            read_ahead (``int``, *optional*):
+                Number of blocks fetched in advance when the file is read sequentially.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for each block, by default the client timeout.
+
+        Returns:
+            :obj:`RemoteFile`: Return a seekable file with async `read` and `readinto` methods.
+
+        Example:
+            .. code-block:: python
+
+                ...
+                async with await mega.open("/path/to/file.zip") as file:
+                    file.seek(-22, os.SEEK_END)
+                    footer = await file.read(22)
+                ...
+        """
+        node = await self.get_node(node)
+        if not node.isFile():
+            raise ValueError("The node isn't a file")
+
+        return RemoteFile(
+            self,
+            node,
+            block_size=block_size,
+            cache_size=cache_size,
+            read_ahead=read_ahead,
+            timeout=timeout,
+        )
+
+    async def _stream_into(
+        self,
+        node: MegaNode,
+        offset: int,
+        buffer: memoryview,
+        timeout: Optional[float] = None,
+        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+        progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+    ) -> int:
+        # Stream `len(buffer)` bytes from `offset` straight into `buffer`
+        if not buffer:
+            return 0
+        pos = 0
+
+        def write(data: memoryview, size: int) -> bool:
+            nonlocal pos
+            n = min(size, len(buffer) - pos)
+            buffer[pos : pos + n] = data[:n]
+            pos += n
+            return True
+
+        await self._transfer(
+            self.api.startStreaming,
+            node,
+            offset,
+            len(buffer),
+            progress=progress,
+            progress_args=progress_args,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            on_data=write,
+            timeout=timeout,
+        )
+        return pos
 
     async def share(
         self,
         node: Union[int, str, MegaNode],
         user: Union[str, MegaUser],
         level: MegaShare,
+        timeout: Optional[float] = None,
     ) -> None:
         """
         Share or stop sharing a folder in MEGA with another user using his email.
@@ -647,19 +1960,27 @@ class Mega(object):
                     - `MegaShare.ACCESS_FULL` = 2
                     - `MegaShare.ACCESS_OWNER` = 3
 
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
         """
 
-        await self._request(self.api.share, node, user, level)
+        await self._request(self.api.share, node, user, level, timeout=timeout)
 
-    async def why_am_i_blocked(self) -> Tuple[int, str]:
+    async def why_am_i_blocked(self, timeout: Optional[float] = None) -> Tuple[int, str]:
         """
         Check the reason of being blocked.
 
+        Parameters:
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
+
         Returns:
             :obj:`Tuple[int, str]`: An tuple with the reason code and the text.
         """
 
-        req = await self._request(self.api.whyAmIBlocked)
+        req = await self._request(self.api.whyAmIBlocked, timeout=timeout)
         return (req.getNumber(), req.getText())
 
     async def retry_transfer(
@@ -667,6 +1988,9 @@ class Mega(object):
         transfer: MegaTransfer,
         progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
         progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        timeout: Optional[float] = None,
     ) -> MegaTransfer:
         """
         Retry a transfer.
@@ -676,8 +2000,28 @@ class Mega(object):
         MegaTransfer object in onTransferFinish (calling `MegaTransfer.copy(...)` to take the ownership) 
         and use it later with this function.
 
+        Parameters:
+            transfer (``MegaTransfer``):
+                Transfer to retry.
+
+            progress (``callable``, *optional*):
+                Pass a callback function to view the file transmission progress, as in `download(...)`.
+
+            progress_args (``tuple``, *optional*):
+                Extra custom arguments for the progress callback function.
+
+            progress_interval (``float``, *optional*):
+                Minimum time in seconds between two calls of the progress callback.
+
+            progress_delta (``int``, *optional*):
+                Minimum amount of bytes transmitted between two calls of the progress callback.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the transfer, by default the client timeout. When exceeded the
+                transfer is cancelled and `MegaTimeoutError` is raised.
+
         Returns:
-            :obj:`MegaTransfer`: The new MegaTransfer object.
+            :obj:`MegaTransfer`: The new MegaTransfer object (a `TransferInfo` with `snapshots`).
         """
 
         transfer = await self._transfer(
@@ -685,15 +2029,19 @@ class Mega(object):
             transfer,
             progress=progress,
             progress_args=progress_args,
+            progress_interval=progress_interval,
+            progress_delta=progress_delta,
+            timeout=timeout,
         )
 
-        return transfer
+        return self._transfer_result(transfer)
 
     async def move_node(
         self,
         node: Union[str, int, MegaNode],
         new_parent: Union[str, int, MegaNode],
         new_name: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> None:
         """
         Move a node in the MEGA account changing the file name.
@@ -707,20 +2055,27 @@ class Mega(object):
 
             new_name (``str``, *optional*):
                 Name for the new node.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
         """
 
-        node = self.get_node(node)
-        new_parent = self.get_node(new_parent)
+        node = await self.get_node(node)
+        new_parent = await self.get_node(new_parent)
         if new_name is None:
-            await self._request(self.api.moveNode, node, new_parent)
+            await self._request(self.api.moveNode, node, new_parent, timeout=timeout)
         else:
-            await self._request(self.api.moveNode, node, new_parent, new_name)
+            await self._request(
+                self.api.moveNode, node, new_parent, new_name, timeout=timeout
+            )
 
     async def copy_node(
         self,
         node: Union[str, int, MegaNode],
         new_parent: Union[str, int, MegaNode],
         new_name: str = None,
+        timeout: Optional[float] = None,
     ) -> None:
         """
         Copy a node in the MEGA account changing the file name.
@@ -734,14 +2089,20 @@ class Mega(object):
 
             new_name (``str``, *optional*):
                 Name for the new node.
+
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
         """
 
-        node = self.get_node(node)
-        new_parent = self.get_node(new_parent)
+        node = await self.get_node(node)
+        new_parent = await self.get_node(new_parent)
         if new_name is None:
-            await self._request(self.api.copyNode, node, new_parent)
+            await self._request(self.api.copyNode, node, new_parent, timeout=timeout)
         else:
-            await self._request(self.api.copyNode, node, new_parent, new_name)
+            await self._request(
+                self.api.copyNode, node, new_parent, new_name, timeout=timeout
+            )
 
     async def export_node(
         self,
@@ -749,6 +2110,7 @@ class Mega(object):
         expire_time: int = (1 << 63) - 1,
         writable: bool = False,
         mega_hosted: bool = True,
+        timeout: Optional[float] = None,
     ) -> str:
         """
         Generate a public link of a file/folder in MEGA.
@@ -766,17 +2128,28 @@ class Mega(object):
             mega_hosted (``bool``):
                 If the share key should be shared with MEGA.
 
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
+
         Returns:
             :obj:`str`: Public link
         """
-        node = self.get_node(node)
+        node = await self.get_node(node)
         req = await self._request(
-            self.api.exportNode, node, expire_time, writable, mega_hosted
+            self.api.exportNode,
+            node,
+            expire_time,
+            writable,
+            mega_hosted,
+            timeout=timeout,
         )
 
         return req.getLink()
 
-    async def get_public_node(self, link: str) -> MegaNode:
+    async def get_public_node(
+        self, link: str, timeout: Optional[float] = None
+    ) -> MegaNode:
         """
         Get a MegaNode from a public link to a file.
 
@@ -786,9 +2159,13 @@ class Mega(object):
             link (``str``):
                 Public link to a file in MEGA.
 
+            timeout (``float``, *optional*):
+                Deadline in seconds for the request, by default the client timeout. When exceeded
+                `MegaTimeoutError` is raised, but the request may still complete in MEGA.
+
         Returns:
             :obj:`MegaNode`: Public `MegaNode` corresponding to the public link
         """
 
-        req = await self._request(self.api.getPublicNode, link)
+        req = await self._request(self.api.getPublicNode, link, timeout=timeout)
         return req.getPublicMegaNode()
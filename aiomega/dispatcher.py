@@ -0,0 +1,52 @@
+import asyncio
+import collections
+import logging
+
+from typing import Any, Callable, Deque, Tuple
+
+
+class Dispatcher(object):
+    """
+    Run callbacks posted from the SDK threads in the event loop.
+
+    Posted callbacks are queued in a deque and the loop is woken up only when
+    there isn't a drain already scheduled, so a burst of SDK callbacks costs a
+    single write to the loop self-pipe instead of one per callback.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self._queue: Deque[Tuple[Callable[..., Any], Tuple]] = collections.deque()
+        self._scheduled = False
+
+    def call_soon(self, callback: Callable[..., Any], *args) -> None:
+        """
+        Schedule `callback(*args)` in the event loop. Thread-safe.
+        """
+        self._queue.append((callback, args))
+
+        # A drain clears the flag before processing the queue, so the worst
+        # case of racing producers is a spare wakeup, never a lost callback
+        if not self._scheduled:
+            self._scheduled = True
+            try:
+                self.loop.call_soon_threadsafe(self._drain)
+            except RuntimeError:
+                logging.warning("Event loop closed, dropping SDK callbacks")
+
+    def _drain(self) -> None:
+        self._scheduled = False
+
+        # Callbacks posted while draining are left to the next wakeup to
+        # avoid starving the loop under a continuous burst
+        for _ in range(len(self._queue)):
+            callback, args = self._queue.popleft()
+            try:
+                callback(*args)
+            except Exception as exc:
+                self.loop.call_exception_handler(
+                    {
+                        "message": "Exception in SDK callback {!r}".format(callback),
+                        "exception": exc,
+                    }
+                )
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Union
 
 
@@ -21,3 +22,24 @@ class MegaNodeNotFound(Exception):
         if isinstance(self.node, int):
             return f"The node with the handle {self.node} doesn't exists anymore"
         return f"The node with path {self.node} doesn't exists anymore"
+
+
+class MegaTimeoutError(asyncio.TimeoutError):
+    def __init__(self, timeout: float, *args) -> None:
+        self.timeout = timeout
+        super().__init__(*args)
+
+    def __str__(self) -> str:
+        return f"The operation didn't finish within {self.timeout} seconds"
+
+
+class MegaBufferOverflowError(Exception):
+    def __init__(self, limit: int, *args) -> None:
+        self.limit = limit
+        super().__init__(*args)
+
+    def __str__(self) -> str:
+        return (
+            f"The stream received more than {self.limit} bytes beyond its buffer while "
+            "the consumer was behind"
+        )
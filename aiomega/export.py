@@ -0,0 +1,136 @@
+import array
+import collections
+
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    from .megasdk import MegaApi, MegaNode
+
+# Handles are unsigned 64-bit integers, the root parent is reported as -1 by some builds
+_HANDLE_MASK = (1 << 64) - 1
+
+
+class TreeColumns(object):
+    """
+    Metadata of a node tree stored by columns, in compact `array.array` buffers.
+
+    The names are encoded in UTF-8 and concatenated in `names`, the name of the node `i`
+    is `names[name_offsets[i]:name_offsets[i + 1]]`, like in an Arrow string array.
+    """
+
+    __slots__ = (
+        "handle",
+        "parent",
+        "type",
+        "size",
+        "ctime",
+        "mtime",
+        "name_offsets",
+        "names",
+    )
+
+    def __init__(self) -> None:
+        self.handle = array.array("Q")
+        self.parent = array.array("Q")
+        self.type = array.array("b")
+        self.size = array.array("q")
+        self.ctime = array.array("q")
+        self.mtime = array.array("q")
+        self.name_offsets = array.array("q", [0])
+        self.names = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.handle)
+
+    def append(self, node: "MegaNode") -> None:
+        self.handle.append(node.getHandle() & _HANDLE_MASK)
+        self.parent.append(node.getParentHandle() & _HANDLE_MASK)
+        self.type.append(node.getType())
+        self.size.append(node.getSize())
+        self.ctime.append(node.getCreationTime())
+        self.mtime.append(node.getModificationTime())
+        self.names += node.getName().encode("utf-8", "surrogateescape")
+        self.name_offsets.append(len(self.names))
+
+
+def scan_tree(api: "MegaApi", root: "MegaNode") -> TreeColumns:
+    """
+    Collect the metadata of `root` and every node below it, in breadth-first order.
+
+    Each node proxy is dropped as soon as its values are copied into the columns.
+    """
+    columns = TreeColumns()
+    columns.append(root)
+
+    folders = collections.deque([root] if root.isFolder() else [])
+    while folders:
+        folder = folders.popleft()
+        children = api.getChildren(folder)
+        for i in range(children.size()):
+            node = children.get(i)
+            columns.append(node)
+            if node.isFolder():
+                folders.append(node.copy())
+    return columns
+
+
+def to_numpy(columns: TreeColumns) -> Dict[str, Any]:
+    """
+    Return the columns as NumPy arrays sharing the memory of `columns`.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "NumPy is required to export the tree, install it with `pip install numpy`"
+        ) from None
+
+    return {
+        "handle": numpy.frombuffer(columns.handle, dtype=numpy.uint64),
+        "parent": numpy.frombuffer(columns.parent, dtype=numpy.uint64),
+        "type": numpy.frombuffer(columns.type, dtype=numpy.int8),
+        "size": numpy.frombuffer(columns.size, dtype=numpy.int64),
+        "ctime": numpy.frombuffer(columns.ctime, dtype=numpy.int64),
+        "mtime": numpy.frombuffer(columns.mtime, dtype=numpy.int64),
+        "name_offsets": numpy.frombuffer(columns.name_offsets, dtype=numpy.int64),
+        "names": numpy.frombuffer(columns.names, dtype=numpy.uint8),
+    }
+
+
+def to_arrow(columns: TreeColumns) -> Any:
+    """
+    Return the columns as a `pyarrow.Table`, with the names as a single string column.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "PyArrow is required to export the tree, install it with `pip install pyarrow`"
+        ) from None
+
+    def column(values: array.array, type_: "pyarrow.DataType") -> "pyarrow.Array":
+        return pyarrow.Array.from_buffers(
+            type_, len(columns), [None, pyarrow.py_buffer(values)]
+        )
+
+    names = pyarrow.Array.from_buffers(
+        pyarrow.large_string(),
+        len(columns),
+        [
+            None,
+            pyarrow.py_buffer(columns.name_offsets),
+            pyarrow.py_buffer(columns.names),
+        ],
+    )
+    return pyarrow.Table.from_arrays(
+        [
+            column(columns.handle, pyarrow.uint64()),
+            column(columns.parent, pyarrow.uint64()),
+            column(columns.type, pyarrow.int8()),
+            column(columns.size, pyarrow.int64()),
+            column(columns.ctime, pyarrow.int64()),
+            column(columns.mtime, pyarrow.int64()),
+            names,
+        ],
+        names=["handle", "parent", "type", "size", "ctime", "mtime", "name"],
+    )
@@ -0,0 +1,214 @@
+import asyncio
+import collections
+import io
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from .client import Mega
+    from .megasdk import MegaNode
+
+
+class RemoteFile(object):
+    """
+    Read-only seekable file over a remote node.
+
+    The file is read in blocks of `block_size` bytes, each one fetched with a ranged
+    streaming transfer and kept in a LRU cache of `cache_size` blocks, so small reads
+    near each other don't start a new transfer every time. When the reads are
+    sequential, the next `read_ahead` blocks are fetched in the background.
+
+    Use `Mega.open(...)` to create it.
+    """
+
+    def __init__(
+        self,
+        client: "Mega",
+        node: "MegaNode",
+        block_size: int = 1048576,
+        cache_size: int = 32,
+        read_ahead: int = 4,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.node = node
+        self.name = node.getName()
+        self.size = node.getSize()
+        self.block_size = block_size
+        self.cache_size = max(cache_size, read_ahead + 1)
+        self.read_ahead = read_ahead
+        self.timeout = timeout
+
+        self._pos = 0
+        self._closed = False
+
+        # Index of the last block read and amount of consecutive blocks read in order
+        self._last = -1
+        self._streak = 0
+
+        # Blocks are cached as futures, so concurrent reads share the same transfer
+        self._blocks: "collections.OrderedDict[int, asyncio.Future]" = (
+            collections.OrderedDict()
+        )
+
+        # Blocks still being downloaded, cached or not, with the amount of reads
+        # awaiting each one
+        self._fetching: Dict[asyncio.Future, int] = {}
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """
+        Change the position of the file, like `io.IOBase.seek`.
+
+        Returns:
+            :obj:`int`: The new absolute position.
+        """
+        self._check_closed()
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError("invalid whence ({}, should be 0, 1 or 2)".format(whence))
+
+        if pos < 0:
+            raise ValueError("negative seek position {}".format(pos))
+        self._pos = pos
+        return pos
+
+    async def readinto(self, buffer: memoryview) -> int:
+        """
+        Read up to `len(buffer)` bytes into `buffer`.
+
+        Returns:
+            :obj:`int`: The amount of bytes read, `0` at the end of the file.
+        """
+        self._check_closed()
+        buffer = memoryview(buffer).cast("B")
+        n = min(len(buffer), max(0, self.size - self._pos))
+
+        done = 0
+        while done < n:
+            index, start = divmod(self._pos + done, self.block_size)
+            block = await self._get_block(index)
+            k = min(n - done, len(block) - start)
+            if k <= 0:
+                # The node is shorter than announced
+                break
+            buffer[done : done + k] = block[start : start + k]
+            done += k
+
+        self._pos += done
+        return done
+
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Read up to `size` bytes, or until the end of the file if `size` is negative.
+        """
+        self._check_closed()
+        if size < 0:
+            size = max(0, self.size - self._pos)
+
+        chunk = bytearray(min(size, max(0, self.size - self._pos)))
+        n = await self.readinto(memoryview(chunk))
+        del chunk[n:]
+        return bytes(chunk)
+
+    async def close(self) -> None:
+        """
+        Close the file, cancelling the blocks still being fetched.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        self._blocks.clear()
+        fetching = list(self._fetching)
+        for future in fetching:
+            future.cancel()
+        await asyncio.gather(*fetching, return_exceptions=True)
+
+    async def __aenter__(self) -> "RemoteFile":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def _check_closed(self) -> None:
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+
+    async def _get_block(self, index: int) -> bytearray:
+        if index == self._last + 1:
+            self._streak += 1
+        elif index != self._last:
+            self._streak = 0
+        self._last = index
+
+        future = self._fetch(index)
+        waiting = future in self._fetching
+        if waiting:
+            self._fetching[future] += 1
+
+        try:
+            # Two blocks in a row is enough to assume the reads are sequential
+            if self._streak >= 2:
+                last = (self.size - 1) // self.block_size
+                for i in range(index + 1, min(index + self.read_ahead, last) + 1):
+                    self._fetch(i)
+
+            return await asyncio.shield(future)
+        finally:
+            if waiting and future in self._fetching:
+                self._fetching[future] -= 1
+
+    def _fetch(self, index: int) -> asyncio.Future:
+        future = self._blocks.get(index)
+        if future is not None:
+            self._blocks.move_to_end(index)
+            return future
+
+        future = asyncio.ensure_future(self._download(index))
+        future.add_done_callback(lambda f: self._on_fetched(index, f))
+        self._blocks[index] = future
+        self._fetching[future] = 0
+
+        # An evicted block still being downloaded is cancelled, unless a read awaits it
+        while len(self._blocks) > self.cache_size:
+            _, evicted = self._blocks.popitem(last=False)
+            if self._fetching.get(evicted) == 0:
+                evicted.cancel()
+        return future
+
+    def _on_fetched(self, index: int, future: asyncio.Future) -> None:
+        self._fetching.pop(future, None)
+
+        # Don't cache errors, a later read tries again
+        if future.cancelled() or future.exception() is not None:
+            if self._blocks.get(index) is future:
+                del self._blocks[index]
+
+    async def _download(self, index: int) -> bytearray:
+        start = index * self.block_size
+        block = bytearray(min(self.block_size, self.size - start))
+        with memoryview(block) as view:
+            n = await self.client._stream_into(self.node, start, view, self.timeout)
+        del block[n:]
+        return block
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+FINGERPRINT = "fingerprint"
+CRC = "crc"
+SHA256 = "sha256"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (dev, ino, kind)
+) WITHOUT ROWID
+"""
+
+
+def _stat_key(st: os.stat_result) -> Tuple[int, int, int, int]:
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def content_hash(path: str, chunk_size: int = 1048576) -> str:
+    """
+    Return the SHA-256 of the content of a file, in hexadecimal.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat_all(paths: Iterable[str]) -> Dict[str, os.stat_result]:
+    return {path: os.stat(path) for path in paths}
+
+
+def _compute(
+    func: Callable[[str], str], path: str, st: os.stat_result
+) -> Tuple[str, Optional[os.stat_result]]:
+    # Runs in the executor. The stat is taken again after reading the file, and the
+    # value is only cached if the file didn't change meanwhile
+    value = func(path)
+    after = os.stat(path)
+    return value, after if _stat_key(after) == _stat_key(st) else None
+
+
+class FingerprintCache(object):
+    """
+    Persistent cache of fingerprints (or any other digest) of local files.
+
+    The values are keyed by the device, inode, size and modification time of the file,
+    so a file is only read again after it changes, even if it was renamed. The cache
+    is stored in a SQLite database, use `":memory:"` to keep it only in memory.
+
+    The missing values are computed in `executor`, by default the thread pool of the
+    loop. A process pool can be used as long as the function is picklable, like a
+    `hashlib` based one; the SDK methods are not.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        executor: Optional[Executor] = None,
+        concurrency: Optional[int] = None,
+    ) -> None:
+        self.path = path
+        self.executor = executor
+        self.concurrency = concurrency or min(32, (os.cpu_count() or 1) + 4)
+        self.hits = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(path)
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+
+    def lookup(self, st: os.stat_result, kind: str = FINGERPRINT) -> Optional[str]:
+        """
+        Return the cached value for the file with the status `st`, or `None`.
+        """
+        dev, ino, size, mtime_ns = _stat_key(st)
+        row = self._db.execute(
+            "SELECT value FROM digests"
+            " WHERE dev = ? AND ino = ? AND kind = ? AND size = ? AND mtime_ns = ?",
+            (dev, ino, kind, size, mtime_ns),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def store(self, st: os.stat_result, value: str, kind: str = FINGERPRINT) -> None:
+        """
+        Cache `value` for the file with the status `st`.
+        """
+        self._db.execute(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)",
+            (*_stat_key(st), kind, value),
+        )
+
+    async def get(
+        self,
+        path: str,
+        func: Callable[[str], str],
+        kind: str = FINGERPRINT,
+        st: Optional[os.stat_result] = None,
+    ) -> str:
+        """
+        Return the value of a file, computing it with `func(path)` if it isn't cached.
+        """
+        result = await self.get_many({path: st} if st is not None else [path], func, kind)
+        return result[path]
+
+    async def get_many(
+        self,
+        paths: Union[Iterable[str], Mapping[str, os.stat_result]],
+        func: Callable[[str], str],
+        kind: str = FINGERPRINT,
+    ) -> Dict[str, str]:
+        """
+        Return the values of many files, computing the missing ones concurrently.
+
+        Parameters:
+            paths (``Union[Iterable[str], Mapping[str, os.stat_result]]``):
+                Paths of the files, or a map of the paths to their status if they are
+                already known, like after a directory scan.
+
+            func (``callable``):
+                Function that computes the value from the path of a file.
+
+            kind (``str``, *optional*):
+                Name of the value, to keep different digests of the same file.
+
+        Returns:
+            :obj:`Dict[str, str]`: Map of each path to its value.
+        """
+        loop = asyncio.get_event_loop()
+        if not isinstance(paths, Mapping):
+            paths = await loop.run_in_executor(None, _stat_all, list(paths))
+
+        result = {}
+        missing = []
+        for path, st in paths.items():
+            value = self.lookup(st, kind)
+            if value is None:
+                missing.append((path, st))
+            else:
+                result[path] = value
+        self.hits += len(result)
+        self.misses += len(missing)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def compute(path: str, st: os.stat_result) -> None:
+            async with semaphore:
+                value, st = await loop.run_in_executor(
+                    self.executor, _compute, func, path, st
+                )
+            result[path] = value
+            if st is not None:
+                self.store(st, value, kind)
+
+        try:
+            await asyncio.gather(*(compute(path, st) for path, st in missing))
+        finally:
+            self._db.commit()
+        return result
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "FingerprintCache":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
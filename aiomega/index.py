@@ -0,0 +1,245 @@
+import collections
+import threading
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class PathIndex(object):
+    """
+    LRU map of absolute remote paths to node handles.
+
+    Every ancestor of a cached path is cached too, and it's always more recently used
+    than its descendants, so the LRU eviction never leaves a path without its ancestors
+    and invalidating a folder drops every cached path below it.
+
+    The index is shared between the event loop (lookups) and the SDK thread (node
+    updates), so all the operations take a lock.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        # Incremented on every invalidation, see `put`
+        self.generation = 0
+
+        self._paths: "collections.OrderedDict[str, int]" = collections.OrderedDict()
+        self._handles: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(path: str) -> Optional[str]:
+        """
+        Return the key used for `path`, or `None` if the path can't be cached.
+        """
+        # Only plain paths from the root, not "//bin" like locations
+        if not path.startswith("/") or path.startswith("//"):
+            return None
+
+        path = path.rstrip("/") or "/"
+        if "//" in path:
+            return None
+
+        # The SDK resolves "." and ".." as relative components and "\\" as an
+        # escape, so the ancestors of those paths aren't their prefixes
+        if "\\" in path or any(name in (".", "..") for name in path.split("/")):
+            return None
+        return path
+
+    @staticmethod
+    def ancestors(path: str) -> List[str]:
+        """
+        Return the ancestors of a normalized path, from the parent up to the root.
+        """
+        result = []
+        i = len(path) if path != "/" else 0
+        while i > 0:
+            i = path.rfind("/", 0, i)
+            result.append(path[:i] or "/")
+        return result
+
+    def get(self, path: str) -> Optional[int]:
+        with self._lock:
+            handle = self._paths.get(path)
+            if handle is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._touch(path)
+            return handle
+
+    def cached(self, path: str, handle: int) -> bool:
+        """
+        Check if `path` is cached with `handle`, without updating the counters.
+        """
+        with self._lock:
+            return self._paths.get(path) == handle
+
+    def put(self, chain: Iterable[Tuple[str, int]], generation: int) -> None:
+        """
+        Cache a path and its ancestors.
+
+        Parameters:
+            chain (``Iterable[Tuple[str, int]]``):
+                Pairs of path and handle, from the resolved path up to the root (or to an
+                ancestor already cached).
+
+            generation (``int``):
+                Value of `generation` before resolving the path. Nothing is cached if some
+                node changed meanwhile, because the resolution could be stale.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return
+
+            # Drop stale entries first, discarding them also drops descendants
+            chain = list(chain)
+            for path, handle in chain:
+                if self._paths.get(path, handle) != handle:
+                    self._discard(path)
+                old = self._handles.get(handle)
+                if old is not None and old != path:
+                    self._discard(old)
+
+            for path, handle in chain:
+                self._paths[path] = handle
+                self._handles[handle] = path
+            if chain:
+                self._touch(chain[0][0])
+
+            while len(self._paths) > self.maxsize:
+                _, handle = self._paths.popitem(last=False)
+                del self._handles[handle]
+
+    def invalidate(self, handle: int) -> None:
+        """
+        Drop the path of a node and every cached path below it.
+        """
+        with self._lock:
+            self.generation += 1
+            path = self._handles.get(handle)
+            if path is not None:
+                self._discard(path)
+
+    def invalidate_child(self, parent: int, name: str) -> None:
+        """
+        Drop the cached path that a child of `parent` named `name` would have.
+        """
+        with self._lock:
+            self.generation += 1
+            path = self._handles.get(parent)
+            if path is not None:
+                self._discard(path.rstrip("/") + "/" + name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._paths.clear()
+            self._handles.clear()
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._paths))
+
+    def _touch(self, path: str) -> None:
+        # Keep the ancestors more recently used than the path itself
+        self._paths.move_to_end(path)
+        for ancestor in self.ancestors(path):
+            if ancestor in self._paths:
+                self._paths.move_to_end(ancestor)
+
+    def _discard(self, path: str) -> None:
+        if path not in self._paths:
+            return
+
+        if path == "/":
+            self._paths.clear()
+            self._handles.clear()
+            return
+
+        prefix = path + "/"
+        for p in [p for p in self._paths if p == path or p.startswith(prefix)]:
+            del self._handles[self._paths.pop(p)]
+
+
+class HashIndex(object):
+    """
+    Map of content hashes to the handles of the nodes with that content.
+
+    The index is loaded once from a scan of the account and then kept up to date
+    with the node updates. Updates received while the scan runs win over the scanned
+    values, which could be stale.
+    """
+
+    def __init__(self) -> None:
+        self.loaded = False
+
+        # Incremented by `clear`, a scan started before it is discarded
+        self.generation = 0
+
+        self._nodes: Dict[str, Set[int]] = {}
+        self._hashes: Dict[int, str] = {}
+        self._updated: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def get(self, digest: str) -> List[int]:
+        with self._lock:
+            return list(self._nodes.get(digest, ()))
+
+    def load(self, items: Iterable[Tuple[int, str]], generation: int) -> bool:
+        """
+        Add the pairs of handle and hash found by a scan of the account.
+
+        Returns:
+            :obj:`bool`: `False` if the index was cleared after `generation` was read.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return False
+            for handle, digest in items:
+                if handle not in self._updated:
+                    self._add(handle, digest)
+            self._updated.clear()
+            self.loaded = True
+            return True
+
+    def update(self, handle: int, digest: Optional[str]) -> None:
+        """
+        Set the hash of a node, or drop it if `digest` is `None`.
+        """
+        with self._lock:
+            self._discard(handle)
+            if digest:
+                self._add(handle, digest)
+            if not self.loaded:
+                self._updated.add(handle)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+            self._hashes.clear()
+            self._updated.clear()
+            self.loaded = False
+            self.generation += 1
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _add(self, handle: int, digest: str) -> None:
+        self._discard(handle)
+        self._hashes[handle] = digest
+        self._nodes.setdefault(digest, set()).add(handle)
+
+    def _discard(self, handle: int) -> None:
+        digest = self._hashes.pop(handle, None)
+        if digest is None:
+            return
+        handles = self._nodes[digest]
+        handles.discard(handle)
+        if not handles:
+            del self._nodes[digest]
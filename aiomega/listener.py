@@ -0,0 +1,310 @@
+import asyncio
+import collections
+import inspect
+import logging
+import time
+
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from .megasdk import (
+    MegaApi,
+    MegaRequestListener,
+    MegaTransferListener,
+    MegaGlobalListener,
+    MegaNodeList,
+    MegaRequest,
+    MegaTransfer,
+    MegaError,
+    MegaNode,
+)
+
+from .dispatcher import Dispatcher
+from .error import MegaRequestError
+from .index import HashIndex, PathIndex
+
+
+class Pending(object):
+    """
+    Bookkeeping of an in-flight request or transfer, keyed by its SDK tag.
+    """
+
+    __slots__ = (
+        "dispatcher",
+        "future",
+        "tag",
+        "cancelled",
+        "progress",
+        "progress_args",
+        "progress_interval",
+        "progress_delta",
+        "on_data",
+        "on_finish",
+        "_progress_scheduled",
+        "_progress_latest",
+        "_progress_delivered",
+        "_progress_time",
+        "_progress_bytes",
+    )
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+        progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        progress_delta: int = 0,
+        on_data: Optional[Callable[[memoryview, int], bool]] = None,
+        on_finish: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.future: asyncio.Future = dispatcher.loop.create_future()
+        self.tag: Optional[int] = None
+        self.cancelled = False
+        self.progress = progress
+        self.progress_args = progress_args
+        self.progress_interval = progress_interval
+        self.progress_delta = progress_delta
+        self.on_data = on_data
+        self.on_finish = on_finish
+
+        self._progress_scheduled = False
+        self._progress_latest: Optional[Tuple[int, int, int]] = None
+        self._progress_delivered: Optional[Tuple[int, int, int]] = None
+        self._progress_time = float("-inf")
+        self._progress_bytes = 0
+
+    def _set_result(self, result: Any) -> None:
+        if not self.future.done():
+            self.future.set_result(result)
+
+    def _set_exception(self, exc: BaseException) -> None:
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+    def resolve(self, result: Any, error: MegaError) -> None:
+        # Called from the SDK thread
+        code = error.getErrorCode()
+        if code != MegaError.API_OK:
+            exc = MegaRequestError(code, error.toString())
+            self.dispatcher.call_soon(self._set_exception, exc)
+        else:
+            self.dispatcher.call_soon(self._set_result, result)
+
+    def update_progress(self, current: int, total: int, speed: int) -> None:
+        # Called from the SDK thread. The final update is never throttled
+        if current < total:
+            now = time.monotonic()
+            if (
+                now - self._progress_time < self.progress_interval
+                or 0 <= current - self._progress_bytes < self.progress_delta
+            ):
+                return
+            self._progress_time = now
+        self._progress_bytes = current
+
+        # Only the latest values reach the loop; updates that arrive while
+        # a delivery is already queued just supersede the pending values
+        self._progress_latest = (current, total, speed)
+        if not self._progress_scheduled:
+            self._progress_scheduled = True
+            self.dispatcher.call_soon(self._report_progress)
+
+    def _report_progress(self) -> None:
+        self._progress_scheduled = False
+        latest = self._progress_latest
+        if latest is None or latest is self._progress_delivered:
+            return
+        self._progress_delivered = latest
+
+        r = self.progress(*latest, *self.progress_args)
+        if inspect.isawaitable(r):
+            asyncio.ensure_future(r, loop=self.dispatcher.loop)
+
+
+class RequestListener(MegaRequestListener):
+    """
+    Single request listener shared by every request of a `Mega` client.
+
+    The SDK starts the queued requests in the same order they were pushed, so
+    each start callback binds the oldest queued `Pending` to the tag assigned
+    by the SDK, and the rest of the callbacks are routed by that tag.
+    """
+
+    def __init__(self) -> None:
+        self.queued_requests: Deque[Pending] = collections.deque()
+        self.requests: Dict[int, Pending] = {}
+
+        super().__init__()
+
+    def onRequestStart(self, api: MegaApi, request: MegaRequest) -> None:
+        logging.info("Request start ({})".format(request))
+
+        try:
+            self.requests[request.getTag()] = self.queued_requests.popleft()
+        except IndexError:
+            logging.warning("Untracked request started ({})".format(request))
+
+    def onRequestFinish(
+        self, api: MegaApi, request: MegaRequest, error: MegaError
+    ) -> None:
+        logging.info("Request finished ({}); Result: {}".format(request, error))
+
+        pending = self.requests.pop(request.getTag(), None)
+        if pending is not None:
+            pending.resolve(request.copy(), error)
+
+    def onRequestTemporaryError(
+        self, api: MegaApi, request: MegaRequest, error: MegaError
+    ) -> None:
+        logging.info("Request temporary error ({}); Error: {}".format(request, error))
+
+
+class TransferListener(MegaTransferListener):
+    """
+    Single transfer listener shared by every transfer of a `Mega` client.
+
+    Transfers are bound to their tags in FIFO order like the requests, see
+    `RequestListener`.
+    """
+
+    def __init__(self) -> None:
+        self.queued_transfers: Deque[Pending] = collections.deque()
+        self.transfers: Dict[int, Pending] = {}
+
+        super().__init__()
+
+    def onTransferStart(self, api: MegaApi, transfer: MegaTransfer) -> None:
+        logging.info("Transfer start ({})".format(transfer))
+
+        # Files of a folder transfer are reported with the parent listener
+        if transfer.getFolderTransferTag() > 0:
+            return
+
+        try:
+            pending = self.queued_transfers.popleft()
+        except IndexError:
+            logging.warning("Untracked transfer started ({})".format(transfer))
+            return
+
+        # The tag must be published before checking the cancellation flag,
+        # `Mega._cancel_transfer` does it the other way around
+        pending.tag = transfer.getTag()
+        self.transfers[pending.tag] = pending
+        if pending.cancelled:
+            api.cancelTransfer(transfer)
+
+    def onTransferFinish(
+        self, api: MegaApi, transfer: MegaTransfer, error: MegaError
+    ) -> None:
+        logging.info(
+            "Transfer finished ({} {}); Result: {}".format(
+                transfer, transfer.getFileName(), error
+            )
+        )
+
+        pending = self.transfers.pop(transfer.getTag(), None)
+        if pending is None:
+            return
+
+        if pending.on_finish is not None:
+            pending.on_finish()
+        pending.resolve(transfer.copy(), error)
+
+    def onTransferUpdate(self, api: MegaApi, transfer: MegaTransfer) -> None:
+        logging.info(
+            "Transfer update ({} {});"
+            " Progress: {} KB of {} KB, {} KB/s".format(
+                transfer,
+                transfer.getFileName(),
+                transfer.getTransferredBytes() / 1024,
+                transfer.getTotalBytes() / 1024,
+                transfer.getSpeed() / 1024,
+            )
+        )
+
+        pending = self.transfers.get(transfer.getTag())
+        if pending is None or pending.progress is None:
+            return
+
+        pending.update_progress(
+            transfer.getTransferredBytes(),
+            transfer.getTotalBytes(),
+            transfer.getSpeed(),
+        )
+
+    def onTransferData(
+        self, api: MegaApi, transfer: MegaTransfer, buffer: memoryview, size: int
+    ) -> bool:
+        # `buffer` is a read-only view of the SDK memory, which is freed once this
+        # callback returns. Releasing `buffer` doesn't invalidate views derived
+        # from it, so the sinks must copy the data and must not keep any slice
+        pending = self.transfers.get(transfer.getTag())
+        if pending is None or pending.on_data is None:
+            return True
+        return pending.on_data(buffer, size)
+
+    def onTransferTemporaryError(
+        self, api: MegaApi, transfer: MegaTransfer, error: MegaError
+    ) -> None:
+        logging.info(
+            "Transfer temporary error ({} {}); Error: {}".format(
+                transfer, transfer.getFileName(), error
+            )
+        )
+
+
+class GlobalListener(MegaGlobalListener):
+    """
+    Keep the client caches in sync with the changes of the account filesystem.
+    """
+
+    # Changes that can modify the path of a node
+    PATH_CHANGES = (
+        MegaNode.CHANGE_TYPE_REMOVED
+        | MegaNode.CHANGE_TYPE_ATTRIBUTES
+        | MegaNode.CHANGE_TYPE_PARENT
+        | MegaNode.CHANGE_TYPE_NEW
+    )
+
+    # Changes that can modify the content hash attribute of a node
+    HASH_CHANGES = (
+        MegaNode.CHANGE_TYPE_REMOVED
+        | MegaNode.CHANGE_TYPE_ATTRIBUTES
+        | MegaNode.CHANGE_TYPE_NEW
+    )
+
+    def __init__(
+        self,
+        paths: Optional[PathIndex],
+        hashes: Optional[HashIndex] = None,
+        hash_attribute: Optional[str] = None,
+    ) -> None:
+        self.paths = paths
+        self.hashes = hashes
+        self.hash_attribute = hash_attribute
+
+        super().__init__()
+
+    def onNodesUpdate(self, api: MegaApi, nodes: MegaNodeList) -> None:
+        # No list means the whole filesystem changed
+        if nodes is None:
+            if self.paths is not None:
+                self.paths.clear()
+            if self.hashes is not None:
+                self.hashes.clear()
+            return
+
+        for i in range(nodes.size()):
+            node = nodes.get(i)
+            changes = node.getChanges()
+
+            if self.paths is not None and changes & self.PATH_CHANGES:
+                # Drop both the old location and the new one
+                self.paths.invalidate(node.getHandle())
+                self.paths.invalidate_child(node.getParentHandle(), node.getName())
+
+            if self.hashes is not None and changes & self.HASH_CHANGES:
+                if changes & MegaNode.CHANGE_TYPE_REMOVED:
+                    digest = None
+                else:
+                    digest = node.getCustomAttr(self.hash_attribute)
+                self.hashes.update(node.getHandle(), digest)
@@ -0,0 +1,262 @@
+import asyncio
+import inspect
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .client import Mega
+
+UPLOAD = "upload"
+DOWNLOAD = "download"
+
+
+class TransferJob(object):
+    """
+    Transfer queued in a `TransferManager`.
+    """
+
+    __slots__ = ("direction", "args", "future", "current", "total", "speed")
+
+    def __init__(self, direction: str, args: Tuple, future: asyncio.Future) -> None:
+        self.direction = direction
+        self.args = args
+        self.future = future
+        self.current = 0
+        self.total = 0
+        self.speed = 0
+
+    def __repr__(self) -> str:
+        return "<TransferJob {} {!r}>".format(self.direction, self.args)
+
+
+class TransferManager(object):
+    """
+    Run many uploads and downloads with bounded concurrency.
+
+    The transfers are queued with `upload(...)` and `download(...)`, which only wait
+    while the queue of their direction is full, and run by `uploads` and `downloads`
+    workers, with at most `concurrency` transfers in flight at the same time.
+
+    When `stop_on_error` is set, the first failure cancels the running and queued
+    transfers and is raised by `join()`. Otherwise the failures are collected in
+    `errors` and the rest of the transfers go on.
+
+    Example:
+        .. code-block:: python
+
+            ...
+            async with TransferManager(mega, concurrency=8, stop_on_error=False) as manager:
+                for path in paths:
+                    await manager.upload("/backup", path)
+
+            for job, exc in manager.errors:
+                print(job.args, exc)
+            ...
+    """
+
+    def __init__(
+        self,
+        client: "Mega",
+        concurrency: int = 8,
+        uploads: Optional[int] = None,
+        downloads: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        stop_on_error: bool = True,
+        progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+        progress_args: Optional[Tuple] = (),
+        progress_interval: float = 0,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.concurrency = concurrency
+        self.workers = {
+            UPLOAD: uploads or concurrency,
+            DOWNLOAD: downloads or concurrency,
+        }
+        self.queue_size = queue_size if queue_size is not None else 2 * concurrency
+        self.stop_on_error = stop_on_error
+        self.progress = progress
+        self.progress_args = progress_args
+        self.progress_interval = progress_interval
+        self.timeout = timeout
+
+        self.errors: List[Tuple[TransferJob, BaseException]] = []
+
+        # Aggregated progress of every transfer started so far
+        self.current = 0
+        self.total = 0
+        self.speed = 0
+
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._running: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+    async def upload(
+        self,
+        parent: Any,
+        local_path: str,
+        filename: Optional[str] = None,
+    ) -> asyncio.Future:
+        """
+        Queue the upload of a file or folder, like `Mega.upload(...)`.
+
+        Returns:
+            :obj:`asyncio.Future`: Future resolved with the `MegaTransfer` once the upload finishes.
+        """
+        return await self._submit(UPLOAD, (parent, local_path, filename))
+
+    async def download(self, node: Any, local_path: str) -> asyncio.Future:
+        """
+        Queue the download of a file or folder, like `Mega.download(...)`.
+
+        Returns:
+            :obj:`asyncio.Future`: Future resolved with the `MegaTransfer` once the download finishes.
+        """
+        return await self._submit(DOWNLOAD, (node, local_path))
+
+    async def join(self) -> None:
+        """
+        Wait until every queued transfer finishes.
+
+        Raises the first error if the manager stopped because of it.
+        """
+        if self._queues:
+            await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+        if self._error is not None:
+            raise self._error
+
+    async def close(self) -> None:
+        """
+        Cancel the queued and running transfers and stop the workers.
+        """
+        self._closed = True
+        self._cancel_queued()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def __aenter__(self) -> "TransferManager":
+        return self
+
+    async def __aexit__(self, exc_type, *args) -> None:
+        try:
+            if exc_type is None:
+                await self.join()
+        finally:
+            await self.close()
+
+    async def _submit(self, direction: str, args: Tuple) -> asyncio.Future:
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            raise RuntimeError("The transfer manager is closed")
+        if not self._queues:
+            self._start()
+
+        job = TransferJob(direction, args, asyncio.get_event_loop().create_future())
+        await self._queues[direction].put(job)
+        return job.future
+
+    def _start(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        for direction, workers in self.workers.items():
+            queue = self._queues[direction] = asyncio.Queue(self.queue_size)
+            self._tasks.extend(
+                asyncio.ensure_future(self._worker(queue)) for _ in range(workers)
+            )
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await self._run(job)
+            finally:
+                # The job already left the queue, so if the worker is cancelled
+                # (like while waiting for the semaphore) nobody else resolves it
+                if not job.future.done():
+                    job.future.cancel()
+                queue.task_done()
+
+    async def _run(self, job: TransferJob) -> None:
+        if self._error is not None:
+            job.future.cancel()
+        if job.future.done():
+            return
+
+        async with self._semaphore:
+            # Another job may have failed while this one waited for its turn
+            if self._error is not None:
+                job.future.cancel()
+                return
+
+            if job.direction == UPLOAD:
+                func = self.client.upload
+            else:
+                func = self.client.download
+
+            # The transfer runs in its own task, so a failure of another job can
+            # cancel it without stopping this worker
+            transfer = asyncio.ensure_future(
+                func(
+                    *job.args,
+                    progress=self._on_progress,
+                    progress_args=(job,),
+                    progress_interval=self.progress_interval,
+                    timeout=self.timeout,
+                )
+            )
+            self._running.add(transfer)
+            try:
+                await asyncio.wait((transfer,))
+            except asyncio.CancelledError:
+                job.future.cancel()
+                transfer.cancel()
+                await asyncio.gather(transfer, return_exceptions=True)
+                raise
+            finally:
+                self._running.discard(transfer)
+                self.speed -= job.speed
+                job.speed = 0
+
+            if transfer.cancelled():
+                job.future.cancel()
+            elif transfer.exception() is not None:
+                self._fail(job, transfer.exception())
+            elif not job.future.done():
+                job.future.set_result(transfer.result())
+
+    def _fail(self, job: TransferJob, exc: BaseException) -> None:
+        if not job.future.done():
+            job.future.set_exception(exc)
+            # Reported through `errors` and `join()`, don't warn if nobody awaits it
+            job.future.exception()
+        self.errors.append((job, exc))
+
+        if self.stop_on_error and self._error is None:
+            self._error = exc
+            self._cancel_queued()
+            # The workers stay alive, so the jobs that producers still manage to
+            # queue are cancelled by `_run` instead of waiting forever
+            for transfer in self._running:
+                transfer.cancel()
+
+    def _cancel_queued(self) -> None:
+        for queue in self._queues.values():
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+                queue.task_done()
+
+    def _on_progress(self, current: int, total: int, speed: int, job: TransferJob) -> None:
+        self.current += current - job.current
+        self.total += total - job.total
+        self.speed += speed - job.speed
+        job.current, job.total, job.speed = current, total, speed
+
+        if self.progress is not None:
+            r = self.progress(self.current, self.total, self.speed, *self.progress_args)
+            if inspect.isawaitable(r):
+                asyncio.ensure_future(r)
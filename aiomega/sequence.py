@@ -0,0 +1,44 @@
+import collections.abc
+
+from typing import Any, Callable, Iterator, Optional, Union
+
+
+def _copy(item: Any) -> Any:
+    return item.copy()
+
+
+class NodeSequence(collections.abc.Sequence):
+    """
+    Lazy read-only sequence over a `MegaNodeList` or `MegaTransferList`.
+
+    The SDK items are only converted when accessed, by default with `.copy()` since the
+    items of a list are owned by it. Slices are views over the same list.
+    """
+
+    __slots__ = ("_items", "_range", "_convert")
+
+    def __init__(
+        self,
+        items: Any,
+        convert: Optional[Callable[[Any], Any]] = None,
+        indices: Optional[range] = None,
+    ) -> None:
+        self._items = items
+        self._range = indices if indices is not None else range(items.size())
+        self._convert = convert or _copy
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return NodeSequence(self._items, self._convert, self._range[index])
+        return self._convert(self._items.get(self._range[index]))
+
+    def __iter__(self) -> Iterator[Any]:
+        get, convert = self._items.get, self._convert
+        for i in self._range:
+            yield convert(get(i))
+
+    def __repr__(self) -> str:
+        return "<NodeSequence of {} items>".format(len(self))
@@ -0,0 +1,171 @@
+import collections
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .megasdk import MegaNode, MegaTransfer
+
+# Values of `MegaNode.TYPE_FILE` and `MegaTransfer.TYPE_UPLOAD`, so the snapshots
+# don't need to load the SDK
+_TYPE_FILE = 0
+_TYPE_UPLOAD = 1
+
+
+class NodeInfo(object):
+    """
+    Plain snapshot of the values of a `MegaNode`.
+
+    It doesn't hold any SDK object, so it can be cached for long without keeping native
+    memory alive. It can be passed anywhere a node is expected, it's looked up by handle.
+    """
+
+    __slots__ = (
+        "handle",
+        "parent_handle",
+        "name",
+        "type",
+        "size",
+        "ctime",
+        "mtime",
+        "fingerprint",
+    )
+
+    def __init__(
+        self,
+        handle: int,
+        parent_handle: int,
+        name: str,
+        type: int,
+        size: int,
+        ctime: int,
+        mtime: int,
+        fingerprint: Optional[str],
+    ) -> None:
+        self.handle = handle
+        self.parent_handle = parent_handle
+        self.name = name
+        self.type = type
+        self.size = size
+        self.ctime = ctime
+        self.mtime = mtime
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_node(cls, node: "MegaNode") -> "NodeInfo":
+        return cls(
+            node.getHandle(),
+            node.getParentHandle(),
+            node.getName(),
+            node.getType(),
+            node.getSize(),
+            node.getCreationTime(),
+            node.getModificationTime(),
+            node.getFingerprint(),
+        )
+
+    def is_file(self) -> bool:
+        return self.type == _TYPE_FILE
+
+    def is_folder(self) -> bool:
+        return self.type != _TYPE_FILE
+
+    def __repr__(self) -> str:
+        return "<NodeInfo handle={} name={!r} size={}>".format(
+            self.handle, self.name, self.size
+        )
+
+
+class TransferInfo(object):
+    """
+    Plain snapshot of the values of a finished `MegaTransfer`.
+    """
+
+    __slots__ = (
+        "tag",
+        "type",
+        "file_name",
+        "path",
+        "node_handle",
+        "parent_handle",
+        "transferred_bytes",
+        "total_bytes",
+        "speed",
+        "start_time",
+        "update_time",
+    )
+
+    def __init__(
+        self,
+        tag: int,
+        type: int,
+        file_name: str,
+        path: str,
+        node_handle: int,
+        parent_handle: int,
+        transferred_bytes: int,
+        total_bytes: int,
+        speed: int,
+        start_time: int,
+        update_time: int,
+    ) -> None:
+        self.tag = tag
+        self.type = type
+        self.file_name = file_name
+        self.path = path
+        self.node_handle = node_handle
+        self.parent_handle = parent_handle
+        self.transferred_bytes = transferred_bytes
+        self.total_bytes = total_bytes
+        self.speed = speed
+        self.start_time = start_time
+        self.update_time = update_time
+
+    @classmethod
+    def from_transfer(cls, transfer: "MegaTransfer") -> "TransferInfo":
+        return cls(
+            transfer.getTag(),
+            transfer.getType(),
+            transfer.getFileName(),
+            transfer.getPath(),
+            transfer.getNodeHandle(),
+            transfer.getParentHandle(),
+            transfer.getTransferredBytes(),
+            transfer.getTotalBytes(),
+            transfer.getSpeed(),
+            transfer.getStartTime(),
+            transfer.getUpdateTime(),
+        )
+
+    def is_upload(self) -> bool:
+        return self.type == _TYPE_UPLOAD
+
+    def __repr__(self) -> str:
+        return "<TransferInfo tag={} file_name={!r} total_bytes={}>".format(
+            self.tag, self.file_name, self.total_bytes
+        )
+
+
+class StatResult(
+    collections.namedtuple("StatResult", ["handle", "type", "size", "mtime", "fingerprint"])
+):
+    """
+    Immutable status of a node, returned by `Mega.stat(...)`.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_node(cls, node: "MegaNode") -> "StatResult":
+        return cls(
+            node.getHandle(),
+            node.getType(),
+            node.getSize(),
+            node.getModificationTime(),
+            node.getFingerprint(),
+        )
+
+    def is_file(self) -> bool:
+        return self.type == _TYPE_FILE
+
+    def is_folder(self) -> bool:
+        return self.type != _TYPE_FILE
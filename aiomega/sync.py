@@ -0,0 +1,317 @@
+import asyncio
+import collections
+import os
+import shutil
+import stat
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+from .fingerprint import CRC, FingerprintCache
+from .manager import TransferManager
+
+if TYPE_CHECKING:
+    from .client import Mega
+    from .megasdk import MegaNode
+
+UPLOAD = "upload"
+DOWNLOAD = "download"
+BOTH = "both"
+
+DELETE_LOCAL = "delete_local"
+DELETE_REMOTE = "delete_remote"
+
+SyncAction = collections.namedtuple(
+    "SyncAction", ["kind", "path", "size", "local_path", "node", "parent"]
+)
+SyncAction.__doc__ = """
+Step of a `SyncPlan`. `path` is relative to the synced folders, `node` is the remote
+node of the path if it exists and `parent` the remote folder where it's uploaded.
+"""
+
+
+class SyncPlan(object):
+    """
+    Actions needed to bring two folders in sync, as computed by `Mega.sync(...)`.
+
+    Files with the same size and modification time, or the same content CRC, on both
+    sides are left alone and counted in `unchanged` and `bytes_saved`.
+    """
+
+    def __init__(self, direction: str, delete: bool) -> None:
+        self.direction = direction
+        self.delete = delete
+        self.actions: List[SyncAction] = []
+        self.unchanged = 0
+        self.bytes_saved = 0
+        self.errors: List[Tuple[SyncAction, BaseException]] = []
+
+    @property
+    def bytes_to_transfer(self) -> int:
+        return sum(a.size for a in self.actions if a.kind in (UPLOAD, DOWNLOAD))
+
+    def __iter__(self):
+        return iter(self.actions)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def __repr__(self) -> str:
+        counts = collections.Counter(a.kind for a in self.actions)
+        return "<SyncPlan {} unchanged={} bytes_to_transfer={} bytes_saved={}>".format(
+            dict(counts), self.unchanged, self.bytes_to_transfer, self.bytes_saved
+        )
+
+
+def _scan_local(root: str) -> Tuple[Dict[str, os.stat_result], Set[str]]:
+    # Relative paths (with "/" separators) of everything below `root`, and
+    # apart the symbolic links, which are never followed
+    entries = {}
+    links = set()
+    stack = [""]
+    while stack:
+        prefix = stack.pop()
+        with os.scandir(os.path.join(root, prefix)) as it:
+            for entry in it:
+                path = prefix + entry.name
+                if entry.is_symlink():
+                    links.add(path)
+                    continue
+                entries[path] = entry.stat(follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(path + "/")
+    return entries, links
+
+
+def _scan_remote(client: "Mega", root: "MegaNode") -> Dict[str, "MegaNode"]:
+    entries = {}
+    stack = [("", root)]
+    while stack:
+        prefix, parent = stack.pop()
+        children = client.api.getChildren(parent)
+        for i in range(children.size()):
+            node = children.get(i).copy()
+            path = prefix + node.getName()
+            entries[path] = node
+            if node.isFolder():
+                stack.append((path + "/", node))
+    return entries
+
+
+def _folder_sizes(files) -> Dict[str, int]:
+    # Size of each file, plus the total size below each folder
+    sizes: Dict[str, int] = collections.defaultdict(int)
+    for path, size in files:
+        sizes[path] = size
+        parent = _parent_of(path)
+        while parent:
+            sizes[parent] += size
+            parent = _parent_of(parent)
+    return sizes
+
+
+def _local_path(root: str, path: str) -> str:
+    return os.path.join(root, *path.split("/"))
+
+
+def _parent_of(path: str) -> str:
+    return path.rpartition("/")[0]
+
+
+def _covered(path: str, roots: set) -> bool:
+    # Check if an ancestor of `path` is already handled as a whole
+    parent = _parent_of(path)
+    while parent:
+        if parent in roots:
+            return True
+        parent = _parent_of(parent)
+    return False
+
+
+async def plan_sync(
+    client: "Mega",
+    local_dir: str,
+    remote: "MegaNode",
+    direction: str = UPLOAD,
+    delete: bool = False,
+    fingerprint_cache: Optional[FingerprintCache] = None,
+) -> SyncPlan:
+    if direction not in (UPLOAD, DOWNLOAD, BOTH):
+        raise ValueError("Invalid sync direction {!r}".format(direction))
+    if delete and direction == BOTH:
+        raise ValueError("Deletes can't be planned for a bidirectional sync")
+
+    loop = asyncio.get_event_loop()
+    # Both trees can be large, they are scanned at the same time in worker threads
+    (local, links), remote_nodes = await asyncio.gather(
+        loop.run_in_executor(None, _scan_local, local_dir),
+        loop.run_in_executor(None, _scan_remote, client, remote),
+    )
+    plan = SyncPlan(direction, delete)
+
+    # Missing folders are transferred (or deleted) as a whole, so everything below
+    # them is skipped
+    whole = set()
+
+    def add(kind: str, path: str, size: int, node: Optional["MegaNode"] = None) -> None:
+        parent = _parent_of(path)
+        plan.actions.append(
+            SyncAction(
+                kind,
+                path,
+                size,
+                _local_path(local_dir, path),
+                node,
+                remote_nodes[parent] if parent else remote,
+            )
+        )
+
+    local_sizes = _folder_sizes(
+        (p, st.st_size) for p, st in local.items() if not stat.S_ISDIR(st.st_mode)
+    )
+    remote_sizes = _folder_sizes(
+        (p, n.getSize()) for p, n in remote_nodes.items() if n.isFile()
+    )
+
+    def unchanged(st: os.stat_result) -> None:
+        plan.unchanged += 1
+        plan.bytes_saved += st.st_size
+
+    def changed(path: str, st: os.stat_result, node: "MegaNode") -> None:
+        if direction == UPLOAD or (
+            direction == BOTH and int(st.st_mtime) > node.getModificationTime()
+        ):
+            add(UPLOAD, path, st.st_size, node)
+        else:
+            add(DOWNLOAD, path, node.getSize(), node)
+
+    # Files that only differ in the modification time
+    candidates: Dict[str, Tuple[os.stat_result, "MegaNode"]] = {}
+
+    for path in sorted(local):
+        if _covered(path, whole):
+            continue
+        node = remote_nodes.get(path)
+        st = local[path]
+        is_dir = stat.S_ISDIR(st.st_mode)
+
+        if node is None:
+            if direction == DOWNLOAD:
+                if delete:
+                    add(DELETE_LOCAL, path, local_sizes[path])
+                    whole.add(path)
+            else:
+                add(UPLOAD, path, local_sizes[path])
+                whole.add(path)
+            continue
+
+        if is_dir or node.isFolder():
+            if is_dir != node.isFolder():
+                raise ValueError(
+                    "{!r} is a file in one side and a folder in the other".format(path)
+                )
+            continue
+
+        if st.st_size != node.getSize():
+            changed(path, st, node)
+        elif int(st.st_mtime) == node.getModificationTime():
+            unchanged(st)
+        elif node.getFingerprint():
+            # Only the time differs, decide with the content below
+            candidates[path] = (st, node)
+        else:
+            changed(path, st, node)
+
+    if candidates:
+        cache = fingerprint_cache or FingerprintCache()
+        try:
+            # The SDK fingerprint includes the modification time, which is known to
+            # differ here, so only its CRC part is compared
+            crcs = await cache.get_many(
+                {_local_path(local_dir, p): st for p, (st, _) in candidates.items()},
+                client.api.getCRC,
+                CRC,
+            )
+        finally:
+            if cache is not fingerprint_cache:
+                cache.close()
+
+        for path, (st, node) in candidates.items():
+            if crcs[_local_path(local_dir, path)] == client.api.getCRC(node):
+                unchanged(st)
+            else:
+                changed(path, st, node)
+
+    # The remote nodes in the place of a local link are left alone
+    whole.update(links)
+
+    for path in sorted(remote_nodes):
+        if path in local or path in whole or _covered(path, whole):
+            continue
+        node = remote_nodes[path]
+        if direction == UPLOAD:
+            if delete:
+                add(DELETE_REMOTE, path, remote_sizes[path], node)
+                whole.add(path)
+        else:
+            add(DOWNLOAD, path, remote_sizes[path], node)
+            whole.add(path)
+
+    return plan
+
+
+async def run_sync(
+    client: "Mega",
+    plan: SyncPlan,
+    permanent: bool = False,
+    concurrency: int = 8,
+    progress: Optional[Callable[[int, int, int, Tuple], None]] = None,
+    progress_args: Optional[Tuple] = (),
+    progress_interval: float = 0,
+    timeout: Optional[float] = None,
+) -> SyncPlan:
+    loop = asyncio.get_event_loop()
+    futures = []
+
+    async with TransferManager(
+        client,
+        concurrency=concurrency,
+        stop_on_error=False,
+        progress=progress,
+        progress_args=progress_args,
+        progress_interval=progress_interval,
+        timeout=timeout,
+    ) as manager:
+        for action in plan.actions:
+            if action.kind == UPLOAD:
+                future = await manager.upload(action.parent, action.local_path)
+            elif action.kind == DOWNLOAD:
+                if action.node.isFolder():
+                    target = os.path.dirname(action.local_path) + os.sep
+                else:
+                    target = action.local_path
+                future = await manager.download(action.node, target)
+            else:
+                continue
+            futures.append((action, future))
+
+    for action, future in futures:
+        if not future.cancelled() and future.exception() is not None:
+            plan.errors.append((action, future.exception()))
+
+    for action in plan.actions:
+        try:
+            if action.kind == DELETE_REMOTE:
+                # `remove` skips the Rubbish Bin and drops the versions too
+                if permanent:
+                    await client.remove(action.node, timeout=timeout)
+                else:
+                    await client.move_node(
+                        action.node, client.api.getRubbishNode(), timeout=timeout
+                    )
+            elif action.kind == DELETE_LOCAL:
+                func = shutil.rmtree if os.path.isdir(action.local_path) else os.remove
+                await loop.run_in_executor(None, func, action.local_path)
+        except Exception as exc:
+            plan.errors.append((action, exc))
+
+    return plan
@@ -0,0 +1,58 @@
+"""
+Callbacks/sec delivered from SDK-like threads to the event loop, comparing one
+`loop.call_soon_threadsafe` per callback with the batched `Dispatcher`.
+
+Usage: python benchmarks/dispatcher.py [threads] [callbacks-per-thread]
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from aiomega.dispatcher import Dispatcher
+
+
+async def run(threads: int, count: int, batched: bool) -> float:
+    loop = asyncio.get_event_loop()
+    done = loop.create_future()
+    total = threads * count
+    received = 0
+
+    def callback() -> None:
+        nonlocal received
+        received += 1
+        if received == total:
+            done.set_result(None)
+
+    if batched:
+        post = Dispatcher(loop).call_soon
+    else:
+        post = loop.call_soon_threadsafe
+
+    def producer() -> None:
+        for _ in range(count):
+            post(callback)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=producer) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    await done
+    elapsed = time.perf_counter() - start
+    for w in workers:
+        w.join()
+
+    return total / elapsed
+
+
+def main() -> None:
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    for name, batched in (("call_soon_threadsafe", False), ("Dispatcher", True)):
+        rate = asyncio.run(run(threads, count, batched))
+        print("{:>22}: {:>12,.0f} callbacks/sec".format(name, rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Import cost of `aiomega`, measured with `python -X importtime`, compared with
+the cost paid once the SDK module is actually needed.
+
+Usage: python benchmarks/import_time.py [rounds]
+"""
+import subprocess
+import sys
+
+CASES = (
+    ("import aiomega", "import aiomega"),
+    (
+        "import + load the SDK",
+        "import aiomega, aiomega.megasdk; aiomega.megasdk.MegaApi",
+    ),
+)
+
+
+def measure(code: str) -> int:
+    """
+    Return the sum of the top-level cumulative import times, in microseconds.
+
+    Modules executed lazily show up as top-level imports, so they are counted.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented, their time is in the parent one
+        if not name.startswith("   "):
+            total += int(cumulative)
+    return total
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    # Imports done by the interpreter startup
+    baseline = min(measure("pass") for _ in range(rounds))
+
+    for name, code in CASES:
+        best = min(measure(code) for _ in range(rounds)) - baseline
+        print("{:>22}: {:>8.1f} ms".format(name, best / 1000))
+
+
+if __name__ == "__main__":
+    main()
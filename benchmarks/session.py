@@ -0,0 +1,55 @@
+"""
+Startup time of a worker until its filesystem is ready: a cold start with
+`login` + `ensure_nodes` versus a warm start with `resume` of a dumped session
+and the `base_path` local cache, against the local SDK stand-in.
+
+Usage: python benchmarks/session.py [rounds]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import standin  # noqa: E402
+
+standin.install()
+
+from aiomega import Mega  # noqa: E402
+
+
+async def cold(base_path: str) -> str:
+    async with Mega("APP_KEY", base_path=base_path) as client:
+        await client.login("user@example.com", "password")
+        await client.ensure_nodes()
+        return client.dump_session()
+
+
+async def warm(base_path: str, session: str) -> None:
+    async with Mega("APP_KEY", base_path=base_path) as client:
+        await client.resume(session)
+        client.dump_session()
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with tempfile.TemporaryDirectory() as base_path:
+        cold_times, warm_times = [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            session = asyncio.run(cold(base_path))
+            cold_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            asyncio.run(warm(base_path, session))
+            warm_times.append(time.perf_counter() - start)
+
+    for name, times in (("cold (login)", cold_times), ("warm (resume)", warm_times)):
+        print("{:>14}: {:.3f} s (best of {})".format(name, min(times), rounds))
+
+
+if __name__ == "__main__":
+    main()
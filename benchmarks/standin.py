@@ -0,0 +1,175 @@
+"""
+Local stand-in for the SWIG `megasdk` module, so the benchmarks can drive the
+client without the native SDK or the network.
+
+Requests run in a worker thread like in the SDK. The login runs a real PBKDF2
+to model the key derivation, and fetching the nodes sleeps for `FETCH_COST`
+seconds, or a tenth of it when the `base_path` cache of the session exists.
+"""
+import hashlib
+import itertools
+import os
+import queue
+import sys
+import threading
+import time
+import types
+
+
+class MegaError(object):
+    API_OK = 0
+    API_EINCOMPLETE = -13
+
+    def __init__(self, code: int = 0) -> None:
+        self.code = code
+
+    def getErrorCode(self) -> int:
+        return self.code
+
+    def toString(self) -> str:
+        return "Error {}".format(self.code)
+
+    def copy(self) -> "MegaError":
+        return self
+
+
+class MegaRequest(object):
+    def __init__(self) -> None:
+        self.tag = 0
+
+    def getTag(self) -> int:
+        return self.tag
+
+    def copy(self) -> "MegaRequest":
+        return self
+
+
+class MegaNode(object):
+    CHANGE_TYPE_REMOVED = 0x01
+    CHANGE_TYPE_ATTRIBUTES = 0x02
+    CHANGE_TYPE_PARENT = 0x100
+    CHANGE_TYPE_NEW = 0x400
+
+
+class MegaRequestListener(object):
+    pass
+
+
+class MegaTransferListener(object):
+    pass
+
+
+class MegaGlobalListener(object):
+    pass
+
+
+class _Unused(object):
+    pass
+
+
+MegaNodeList = MegaProxy = MegaTransfer = _Unused
+MegaAccountDetails = MegaUser = MegaShare = _Unused
+
+
+class MegaApi(object):
+    LOGIN_ITERATIONS = 200000
+    FETCH_COST = 1.0
+
+    def __init__(self, app_key: str, base_path: str = None, user_agent: str = None):
+        self.base_path = base_path
+        self.session = None
+        self.filesystem = False
+        self.tags = itertools.count(1)
+        self.queue: "queue.Queue" = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            self.queue.get()()
+
+    def _request(self, listener: MegaRequestListener, work=None) -> None:
+        # SWIG rejects any other type for the listener argument
+        if not isinstance(listener, MegaRequestListener):
+            raise TypeError(
+                "listener must be a MegaRequestListener, not {}".format(
+                    type(listener).__name__
+                )
+            )
+
+        def run():
+            request = MegaRequest()
+            request.tag = next(self.tags)
+            listener.onRequestStart(self, request)
+            if work is not None:
+                work()
+            listener.onRequestFinish(self, request, MegaError())
+
+        self.queue.put(run)
+
+    def _cache(self) -> str:
+        return os.path.join(self.base_path, "megaclient_statecache_{}".format(self.session))
+
+    def addGlobalListener(self, listener: MegaGlobalListener) -> None:
+        pass
+
+    def isLoggedIn(self) -> int:
+        return 1 if self.session else 0
+
+    def isFilesystemAvailable(self) -> bool:
+        return self.filesystem
+
+    def dumpSession(self) -> str:
+        return self.session
+
+    def login(self, email: str, password: str, listener: MegaRequestListener) -> None:
+        def work():
+            key = hashlib.pbkdf2_hmac(
+                "sha512", password.encode(), email.encode(), self.LOGIN_ITERATIONS
+            )
+            # Every login opens a new session, with its own local cache
+            self.session = key[:8].hex() + os.urandom(8).hex()
+
+        self._request(listener, work)
+
+    def fastLogin(self, session: str, listener: MegaRequestListener) -> None:
+        def work():
+            self.session = session
+
+        self._request(listener, work)
+
+    def fetchNodes(self, listener: MegaRequestListener) -> None:
+        def work():
+            cached = self.base_path is not None and os.path.exists(self._cache())
+            time.sleep(self.FETCH_COST / 10 if cached else self.FETCH_COST)
+            if self.base_path is not None:
+                open(self._cache(), "w").close()
+            self.filesystem = True
+
+        self._request(listener, work)
+
+    def localLogout(self, listener: MegaRequestListener) -> None:
+        def work():
+            self.session = None
+            self.filesystem = False
+
+        self._request(listener, work)
+
+    def logout(self, listener: MegaRequestListener) -> None:
+        def work():
+            if self.base_path is not None and os.path.exists(self._cache()):
+                os.remove(self._cache())
+            self.session = None
+            self.filesystem = False
+
+        self._request(listener, work)
+
+
+def install() -> None:
+    """
+    Make `aiomega` import this module instead of the native SDK.
+    """
+    module = types.ModuleType("aiomega.megasdk")
+    for name, value in list(globals().items()):
+        if name.startswith("Mega"):
+            setattr(module, name, value)
+    sys.modules["aiomega.megasdk"] = module
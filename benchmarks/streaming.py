@@ -0,0 +1,101 @@
+"""
+Throughput of the data path used by `Mega.streaming`: the previous OS pipe read
+with `StreamReader`, versus the in-process `RingBuffer`. An SDK-like thread
+delivers the data in `onTransferData` sized pieces, and stops delivering while
+the ring buffer has it paused.
+
+Usage: python benchmarks/streaming.py [MiB] [piece-KiB] [chunk-KiB]
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from aiomega.buffer import RingBuffer
+from aiomega.dispatcher import Dispatcher
+
+
+def produce(write, close, total: int, piece: int, running=None) -> None:
+    data = memoryview(os.urandom(piece))
+    sent = 0
+    while sent < total:
+        if running is not None:
+            running.wait()
+        n = min(piece, total - sent)
+        write(data[:n], n)
+        sent += n
+    close()
+
+
+async def pipe(total: int, piece: int, chunk_size: int) -> float:
+    loop = asyncio.get_event_loop()
+    pipein, pipeout = os.pipe()
+
+    def write(buffer: memoryview, size: int) -> None:
+        n = 0
+        while n < size:
+            n += os.write(pipeout, buffer[n:])
+
+    reader = asyncio.StreamReader()
+    protocol = asyncio.StreamReaderProtocol(reader)
+
+    start = time.perf_counter()
+    producer = threading.Thread(
+        target=produce, args=(write, lambda: os.close(pipeout), total, piece)
+    )
+    producer.start()
+
+    received = 0
+    with os.fdopen(pipein, "rb") as f:
+        await loop.connect_read_pipe(lambda: protocol, f)
+        while not reader.at_eof():
+            received += len(await reader.read(chunk_size))
+    elapsed = time.perf_counter() - start
+    producer.join()
+
+    assert received == total
+    return total / elapsed
+
+
+async def ring(total: int, piece: int, chunk_size: int) -> float:
+    running = threading.Event()
+    running.set()
+    buffer = RingBuffer(
+        8388608,
+        Dispatcher(asyncio.get_event_loop()),
+        pause=running.clear,
+        resume=running.set,
+    )
+
+    start = time.perf_counter()
+    producer = threading.Thread(
+        target=produce, args=(buffer.write, buffer.close, total, piece, running)
+    )
+    producer.start()
+
+    received = 0
+    while True:
+        chunk = await buffer.read(chunk_size)
+        if not chunk:
+            break
+        received += len(chunk)
+    elapsed = time.perf_counter() - start
+    producer.join()
+
+    assert received == total
+    return total / elapsed
+
+
+def main() -> None:
+    total = (int(sys.argv[1]) if len(sys.argv) > 1 else 512) << 20
+    piece = (int(sys.argv[2]) if len(sys.argv) > 2 else 128) << 10
+    chunk_size = (int(sys.argv[3]) if len(sys.argv) > 3 else 2048) << 10
+
+    for name, func in (("os.pipe + StreamReader", pipe), ("RingBuffer", ring)):
+        rate = asyncio.run(func(total, piece, chunk_size))
+        print("{:>22}: {:>8.1f} MiB/s".format(name, rate / (1 << 20)))
+
+
+if __name__ == "__main__":
+    main()
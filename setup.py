@@ -55,6 +55,7 @@ with open("README.md") as readme:
         ],
         keywords=["mega", "client", "internet", "download", "async"],
         install_requires=[],
+        extras_require={"numpy": ["numpy"], "arrow": ["pyarrow"]},
         packages=find_packages(),
         include_package_data=True,
         platforms=["Linux"],
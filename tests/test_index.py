@@ -0,0 +1,72 @@
+import importlib.util
+import os
+
+import pytest
+
+# The package imports the native SDK, the index is loaded on its own so it can be
+# tested without a build
+_spec = importlib.util.spec_from_file_location(
+    "aiomega_index",
+    os.path.join(os.path.dirname(__file__), os.pardir, "aiomega", "index.py"),
+)
+index = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(index)
+
+PathIndex = index.PathIndex
+
+
+@pytest.mark.parametrize(
+    "path, key",
+    [
+        ("/", "/"),
+        ("/a/b", "/a/b"),
+        ("/a/b/", "/a/b"),
+        ("/a.b/..c/...", "/a.b/..c/..."),
+    ],
+)
+def test_normalize_plain_paths(path, key):
+    assert PathIndex.normalize(path) == key
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "a/b",
+        "//bin",
+        "/a//b",
+        "/a/./b",
+        "/a/../b",
+        "/a/.",
+        "/..",
+        "/a\\/b",
+        "/a\\b",
+    ],
+)
+def test_normalize_uncacheable_paths(path):
+    assert PathIndex.normalize(path) is None
+
+
+def test_ancestors():
+    assert PathIndex.ancestors("/") == []
+    assert PathIndex.ancestors("/a") == ["/"]
+    assert PathIndex.ancestors("/a/b/c") == ["/a/b", "/a", "/"]
+
+
+def test_put_and_invalidate():
+    paths = PathIndex()
+    paths.put([("/a/b", 3), ("/a", 2), ("/", 1)], paths.generation)
+    assert paths.get("/a/b") == 3
+    assert paths.get("/a") == 2
+
+    paths.invalidate(2)
+    assert paths.get("/a") is None
+    assert paths.get("/a/b") is None
+    assert paths.get("/") == 1
+
+
+def test_put_skips_stale_generation():
+    paths = PathIndex()
+    generation = paths.generation
+    paths.invalidate(1)
+    paths.put([("/a", 2), ("/", 1)], generation)
+    assert paths.get("/a") is None